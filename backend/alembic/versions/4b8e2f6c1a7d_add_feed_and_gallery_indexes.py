@@ -0,0 +1,58 @@
+"""add feed and gallery indexes
+
+Revision ID: 4b8e2f6c1a7d
+Revises: 1d255ad12374
+Create Date: 2026-10-18 10:12:41.503117
+
+Composite / partial indexes matching the router access paths:
+  - /arts/ feeds:        is_public [+ is_curated | is_premium]
+                         ORDER BY quality_score DESC NULLS LAST, id DESC
+  - /arts/{user_id}:     owner_id + is_public ORDER BY date DESC
+  - /arts/generated/:    owner_id + is_generated ORDER BY date DESC
+                         (also the daily free-generation count in credits)
+  - likes by art_id:     not covered by the (user_id, art_id) primary key
+
+Indexes are built CONCURRENTLY so the migration does not block writes to a
+live arts table. Verify plans with `python -m app.scripts.explain_router_queries`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b8e2f6c1a7d'
+down_revision: Union[str, None] = '1d255ad12374'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = {
+    'ix_arts_public_quality':
+        'ON arts (quality_score DESC NULLS LAST, id DESC) WHERE is_public',
+    'ix_arts_curated_quality':
+        'ON arts (quality_score DESC NULLS LAST, id DESC) WHERE is_public AND is_curated',
+    'ix_arts_premium_quality':
+        'ON arts (quality_score DESC NULLS LAST, id DESC) WHERE is_public AND is_premium',
+    'ix_arts_owner_public_date':
+        'ON arts (owner_id, date DESC, id DESC) WHERE is_public',
+    'ix_arts_owner_generated_date':
+        'ON arts (owner_id, date DESC, id DESC) WHERE is_generated',
+    'ix_likes_art_id':
+        'ON likes (art_id)',
+}
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES.items():
+            op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}')
+        op.execute('ANALYZE arts')
+        op.execute('ANALYZE likes')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in reversed(list(INDEXES)):
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
@@ -0,0 +1,35 @@
+"""add art_neighbors
+
+Revision ID: 5e1a9c3d7f20
+Revises: 7c3d9e1f2b4a
+Create Date: 2026-10-18 18:41:07.215364
+
+One row per art holding its nearest neighbours in the Prompts collection,
+ordered closest first, as parallel int[] / real[] arrays. GET
+/arts/similar/{art_id} reads it with a single primary-key lookup instead of
+a live 50-NN vector query. Filled by `python -m app.scripts.build_art_neighbors`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1a9c3d7f20'
+down_revision: Union[str, None] = '7c3d9e1f2b4a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        'CREATE TABLE IF NOT EXISTS art_neighbors ('
+        'art_id integer PRIMARY KEY REFERENCES arts (id) ON DELETE CASCADE, '
+        'neighbor_ids integer[] NOT NULL, '
+        'distances real[] NOT NULL, '
+        'computed_at timestamp without time zone)'
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP TABLE IF EXISTS art_neighbors')
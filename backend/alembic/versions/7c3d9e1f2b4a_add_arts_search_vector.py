@@ -0,0 +1,45 @@
+"""add arts search_vector
+
+Revision ID: 7c3d9e1f2b4a
+Revises: 4b8e2f6c1a7d
+Create Date: 2026-10-18 14:05:12.881930
+
+Stored generated tsvector over prompt (weight A) and descriptive_prompt
+(weight B), kept current by Postgres on every insert/update, plus a GIN index.
+Serves the lexical search in app/text_search.py, which replaces the
+`prompt ILIKE '%word%'` fallbacks.
+
+Adding a stored generated column rewrites `arts` once; run it off-peak.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3d9e1f2b4a'
+down_revision: Union[str, None] = '4b8e2f6c1a7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(prompt, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(descriptive_prompt, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    op.execute(
+        f'ALTER TABLE arts ADD COLUMN IF NOT EXISTS search_vector tsvector '
+        f'GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED'
+    )
+    with op.get_context().autocommit_block():
+        op.execute('CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_arts_search_vector ON arts USING gin (search_vector)')
+        op.execute('ANALYZE arts')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_arts_search_vector')
+    op.execute('ALTER TABLE arts DROP COLUMN IF EXISTS search_vector')
@@ -0,0 +1,216 @@
+"""
+Shared response cache for anonymous feed, search and similar-art pages.
+
+Entries are JSON-ready payloads keyed by namespace ("feed", "search",
+"similar") plus the request parameters that shape the response. Invalidation
+bumps a per-namespace generation number, so stale entries simply stop being
+addressed and age out through TTL/LRU instead of being scanned for.
+
+Backends:
+  - InProcessBackend: TTL + LRU dict local to the worker (default, and the
+    stand-in for the shared store in dev/tests)
+  - RedisBackend: shared across workers; enabled with RESPONSE_CACHE_URL=redis://...
+
+With InProcessBackend the generation counters are per worker too, so
+invalidate() only reaches the worker that handled the write. Writes that must
+reach every worker therefore bump a version in `feed_state` instead, and
+cached payloads are keyed on it: visibility changes and judge runs bump the
+tier version (feeds.bump_feed_version), new uploads only the content version
+that tier=all pages are keyed on (feeds.bump_content_version, see
+FeedStore.cache_version). Other workers re-read the versions at most
+FEED_VERSION_CHECK_SECONDS later and stop addressing the old entries. With
+several workers and no Redis, a write can take up to that long to show
+everywhere.
+
+Env:
+  RESPONSE_CACHE_URL          - shared store url; unset = in-process
+  RESPONSE_CACHE_MAX_ENTRIES  - LRU capacity of the in-process backend
+  RESPONSE_CACHE_DISABLED     - "true" to bypass the cache entirely
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from .serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL", "")
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
+RESPONSE_CACHE_DISABLED = os.getenv("RESPONSE_CACHE_DISABLED", "false").lower() == "true"
+
+# Default TTLs (seconds) per namespace
+CACHE_TTLS = {
+    "feed": int(os.getenv("FEED_CACHE_TTL", "60")),
+    "search": int(os.getenv("SEARCH_CACHE_TTL", "300")),
+    "similar": int(os.getenv("SIMILAR_CACHE_TTL", "600")),
+}
+
+_MISSING = object()
+
+
+class InProcessBackend:
+    """TTL + LRU store living in this worker (its generation counters are local too)."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return _MISSING
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def size(self) -> int:
+        return len(self._data)
+
+
+class RedisBackend:
+    """Shared store; values are JSON so every worker sees the same payloads."""
+
+    name = "redis"
+
+    def __init__(self, url: str):
+        import redis  # optional dependency, only needed when RESPONSE_CACHE_URL is set
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Any:
+        raw = self._client.get(key)
+        return _MISSING if raw is None else loads(raw)
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        self._client.set(key, dumps(value), ex=ttl)
+
+    def get_counter(self, key: str) -> int:
+        raw = self._client.get(key)
+        return int(raw) if raw is not None else 0
+
+    def incr(self, key: str) -> int:
+        return int(self._client.incr(key))
+
+    def size(self) -> int:
+        return int(self._client.dbsize())
+
+
+class ResponseCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+    def _key(self, namespace: str, parts: tuple) -> str:
+        generation = self.backend.get_counter(f"gen:{namespace}")
+        digest = hashlib.sha1(json.dumps(parts, default=str).encode()).hexdigest()
+        return f"resp:{namespace}:{generation}:{digest}"
+
+    def get(self, namespace: str, parts: tuple) -> Any:
+        """Cached payload for (namespace, parts), or None on a miss."""
+        if RESPONSE_CACHE_DISABLED:
+            return None
+        try:
+            value = self.backend.get(self._key(namespace, parts))
+        except Exception as e:
+            logger.warning(f"response cache read failed: {e}")
+            return None
+        counts = self.misses if value is _MISSING else self.hits
+        counts[namespace] = counts.get(namespace, 0) + 1
+        return None if value is _MISSING else value
+
+    def set(self, namespace: str, parts: tuple, value: Any, ttl: Optional[int] = None) -> None:
+        if RESPONSE_CACHE_DISABLED:
+            return
+        try:
+            self.backend.set(self._key(namespace, parts), value, ttl or CACHE_TTLS.get(namespace, 60))
+        except Exception as e:
+            logger.warning(f"response cache write failed: {e}")
+
+    def get_or_set(self, namespace: str, parts: tuple, compute: Callable[[], Any], ttl: Optional[int] = None) -> Any:
+        """Return the cached payload for (namespace, parts), computing and storing it on a miss.
+
+        `compute` must return JSON-ready data; exceptions propagate and nothing is cached.
+        """
+        if RESPONSE_CACHE_DISABLED:
+            return compute()
+        try:
+            key = self._key(namespace, parts)
+            value = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"response cache read failed: {e}")
+            return compute()
+        if value is not _MISSING:
+            self.hits[namespace] = self.hits.get(namespace, 0) + 1
+            return value
+        self.misses[namespace] = self.misses.get(namespace, 0) + 1
+        value = compute()
+        try:
+            self.backend.set(key, value, ttl or CACHE_TTLS.get(namespace, 60))
+        except Exception as e:
+            logger.warning(f"response cache write failed: {e}")
+        return value
+
+    def invalidate(self, *namespaces: str) -> None:
+        """Drop every entry in the given namespaces (all of them when none are given)."""
+        for namespace in namespaces or tuple(CACHE_TTLS):
+            try:
+                self.backend.incr(f"gen:{namespace}")
+            except Exception as e:
+                logger.warning(f"response cache invalidation failed for {namespace}: {e}")
+
+    def stats(self) -> dict:
+        namespaces = sorted(set(self.hits) | set(self.misses) | set(CACHE_TTLS))
+        per_namespace = {}
+        for namespace in namespaces:
+            hits, misses = self.hits.get(namespace, 0), self.misses.get(namespace, 0)
+            per_namespace[namespace] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+            }
+        try:
+            size = self.backend.size()
+        except Exception:
+            size = None
+        return {"backend": self.backend.name, "entries": size, "namespaces": per_namespace}
+
+
+def _make_backend():
+    if RESPONSE_CACHE_URL:
+        try:
+            return RedisBackend(RESPONSE_CACHE_URL)
+        except Exception as e:
+            logger.error(f"shared response cache unavailable ({e}); using in-process cache")
+    return InProcessBackend()
+
+
+response_cache = ResponseCache(_make_backend())
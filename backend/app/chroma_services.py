@@ -1,15 +1,108 @@
 import chromadb
-from chromadb.utils.embedding_functions import OpenAIEmbeddingFunction
 from chromadb.config import Settings
 import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import List, Optional
 from .config import *
+from .embeddings import EMBEDDING_BACKEND, EMBEDDING_MODEL, collection_name, get_embedding_function
 
 # Define the default local persistence directory relative to this file if CHROMA_DB_PATH is not set
 DEFAULT_LOCAL_CHROMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "chroma_db_local")
 
+# Query-embedding cache: LRU capacity, and an optional sqlite file that survives restarts
+# and is shared by the workers on one host
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "")
+
+
+def normalize_query(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class QueryEmbeddingCache:
+    """normalized query -> embedding, LRU in memory with an optional sqlite write-through."""
+
+    def __init__(self, model: str, max_entries: int = EMBEDDING_CACHE_SIZE, path: str = EMBEDDING_CACHE_PATH):
+        self.model = model
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._db = None
+        if path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                self._db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS query_embeddings ("
+                    "model TEXT NOT NULL, query TEXT NOT NULL, embedding BLOB NOT NULL, "
+                    "PRIMARY KEY (model, query))"
+                )
+                self._db.commit()
+            except Exception as e:
+                print(f"--- Query embedding cache file unavailable ({e}); memory only ---")
+                self._db = None
+
+    def get(self, query: str) -> Optional[List[float]]:
+        with self._lock:
+            embedding = self._data.get(query)
+            if embedding is not None:
+                self._data.move_to_end(query)
+                self.hits += 1
+                return embedding
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT embedding FROM query_embeddings WHERE model = ? AND query = ?", (self.model, query)
+                ).fetchone()
+                if row is not None:
+                    embedding = array("f", row[0]).tolist()
+                    self._remember(query, embedding)
+                    self.disk_hits += 1
+                    return embedding
+            self.misses += 1
+            return None
+
+    def set(self, query: str, embedding: List[float]) -> None:
+        with self._lock:
+            self._remember(query, embedding)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO query_embeddings (model, query, embedding) VALUES (?, ?, ?)",
+                        (self.model, query, array("f", embedding).tobytes()),
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"Query embedding cache write failed: {e}")
+
+    def _remember(self, query: str, embedding: List[float]) -> None:
+        self._data[query] = embedding
+        self._data.move_to_end(query)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._data),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else None,
+            "persistent": self._db is not None,
+        }
+
+
 class ChromaService:
     def __init__(self):
-        self.embedding_function = OpenAIEmbeddingFunction(api_key=OPENAI_API_KEY, model_name="text-embedding-ada-002")
+        # See app/embeddings.py; non-OpenAI backends use their own collections
+        self.embedding_function = get_embedding_function(EMBEDDING_BACKEND, EMBEDDING_MODEL)
+        self.query_cache = QueryEmbeddingCache(f"{EMBEDDING_BACKEND}:{EMBEDDING_MODEL}")
         self.client = None
 
         # Check if ChromaDB is disabled
@@ -76,6 +169,7 @@ class ChromaService:
             self.client = None
 
     def get(self, name: str):
+        name = collection_name(name)
         if self.client is None:
             print(f"ChromaDB not available, returning None for collection: {name}")
             return None
@@ -96,17 +190,85 @@ class ChromaService:
             return None
         return collection
     
+    def embed_query(self, text: str) -> List[float]:
+        """Embedding of a search query; common queries skip the embedding API round-trip."""
+        query = normalize_query(text)
+        embedding = self.query_cache.get(query)
+        if embedding is None:
+            embedding = [float(x) for x in self.embedding_function([query])[0]]
+            self.query_cache.set(query, embedding)
+        return embedding
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """embed_query() for several queries, with every cache miss embedded in one model call."""
+        queries = [normalize_query(text) for text in texts]
+        embeddings = {query: self.query_cache.get(query) for query in queries}
+        missing = [query for query, embedding in embeddings.items() if embedding is None]
+        if missing:
+            for query, embedding in zip(missing, self.embedding_function(missing)):
+                embeddings[query] = [float(x) for x in embedding]
+                self.query_cache.set(query, embeddings[query])
+        return [embeddings[query] for query in queries]
+
+    def query_text(self, collection, text: str, **kwargs):
+        """`collection.query(query_texts=[text])`, but with the query embedding served from the cache."""
+        return collection.query(query_embeddings=[self.embed_query(text)], **kwargs)
+
+    def stored_embedding(self, collection, id_: str) -> Optional[List[float]]:
+        """The vector already stored for `id_`, or None when the collection doesn't hold it."""
+        result = collection.get(ids=[id_], include=["embeddings"])
+        embeddings = result.get("embeddings")
+        if embeddings is None or len(embeddings) == 0:
+            return None
+        return [float(x) for x in embeddings[0]]
+
+    def query_texts(self, collection, texts: List[str], **kwargs):
+        """One multi-query `collection.query` for several texts (see embed_queries)."""
+        return collection.query(query_embeddings=self.embed_queries(texts), **kwargs)
+
     def delete(self, name: str):
         if self.client is None:
             print(f"ChromaDB not available, cannot delete collection: {name}")
             return
-        self.client.delete_collection(name=name)
+        self.client.delete_collection(name=collection_name(name))
 
 chroma = ChromaService()
 
 collection_prompts = chroma.get("Prompts")
 collection_categories = chroma.get("Categories")
 
+# Art columns mirrored into Prompts metadata, so vector queries can filter by tier
+ART_METADATA_FIELDS = ("is_public", "is_curated", "is_premium", "quality_score")
+# feed_state row written once sync_chroma_metadata has backfilled every art
+METADATA_BACKFILL_STATE = "chroma_metadata"
+
+
+def prompt_metadata(art) -> dict:
+    """Chroma metadata for an art row (Chroma rejects None values, so unset fields are left out)."""
+    metadata = {}
+    for field in ART_METADATA_FIELDS:
+        value = getattr(art, field, None)
+        if value is not None:
+            metadata[field] = float(value) if field == "quality_score" else bool(value)
+    return metadata
+
+
+def sync_prompt_metadata(arts, collection=None, batch_size: int = 500) -> int:
+    """Write prompt_metadata() of `arts` onto their Prompts entries; ids Chroma doesn't hold are ignored."""
+    collection = collection or collection_prompts
+    if collection is None:
+        return 0
+    synced = 0
+    arts = list(arts)
+    for start in range(0, len(arts), batch_size):
+        batch = [art for art in arts[start:start + batch_size] if prompt_metadata(art)]
+        if not batch:
+            continue
+        collection.update(ids=[str(art.id) for art in batch], metadatas=[prompt_metadata(art) for art in batch])
+        synced += len(batch)
+    return synced
+
+
 def filter_chroma(results, threshold=0.47):
         int_ids = [int(id_) for id_ in results["ids"][0]]
         distances = results["distances"][0]
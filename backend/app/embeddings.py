@@ -0,0 +1,113 @@
+"""
+Pluggable text-embedding backends for the Chroma collections.
+
+  EMBEDDING_BACKEND=openai                 - OpenAI API (default; what the existing
+                                             Prompts / Categories collections hold)
+  EMBEDDING_BACKEND=onnx                   - all-MiniLM-L6-v2 on CPU via onnxruntime,
+                                             bundled with chromadb; no network at query time
+  EMBEDDING_BACKEND=sentence-transformers  - any sentence-transformers model on CPU
+                                             (pip install sentence-transformers)
+
+Vectors from different backends are not comparable, so every non-default
+backend/model reads and writes its own collections (`Prompts__onnx_all-MiniLM-L6-v2`).
+Populate them with `python -m app.scripts.reembed_collections` before switching;
+until then ChromaService sees an empty collection and search uses the SQL fallback.
+
+Env:
+  EMBEDDING_BACKEND     - openai | onnx | sentence-transformers
+  EMBEDDING_MODEL       - model name; defaults per backend
+  EMBEDDING_BATCH_SIZE  - documents per model call
+"""
+import os
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+from .config import OPENAI_API_KEY
+
+EMBEDDING_BACKENDS = ("openai", "onnx", "sentence-transformers")
+DEFAULT_MODELS = {
+    "openai": "text-embedding-ada-002",
+    "onnx": "all-MiniLM-L6-v2",
+    "sentence-transformers": "all-MiniLM-L6-v2",
+}
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai").lower()
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "") or DEFAULT_MODELS.get(EMBEDDING_BACKEND, "")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+
+
+def _openai(model: str) -> EmbeddingFunction:
+    from chromadb.utils.embedding_functions import OpenAIEmbeddingFunction
+    return OpenAIEmbeddingFunction(api_key=OPENAI_API_KEY, model_name=model)
+
+
+def _onnx(model: str) -> EmbeddingFunction:
+    from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+    if model != DEFAULT_MODELS["onnx"]:
+        raise ValueError(f"onnx backend only ships {DEFAULT_MODELS['onnx']}; use sentence-transformers for {model}")
+    return ONNXMiniLM_L6_V2(preferred_providers=["CPUExecutionProvider"])
+
+
+def _sentence_transformers(model: str) -> EmbeddingFunction:
+    from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
+    return SentenceTransformerEmbeddingFunction(model_name=model, device="cpu", normalize_embeddings=True)
+
+
+_FACTORIES: Dict[str, Callable[[str], EmbeddingFunction]] = {
+    "openai": _openai,
+    "onnx": _onnx,
+    "sentence-transformers": _sentence_transformers,
+}
+
+
+class LazyEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Builds the backend on first use (once per process) and embeds in fixed-size batches."""
+
+    def __init__(self, backend: str, model: str, batch_size: int = EMBEDDING_BATCH_SIZE):
+        if backend not in _FACTORIES:
+            raise ValueError(f"unknown EMBEDDING_BACKEND {backend!r}; expected one of {EMBEDDING_BACKENDS}")
+        self.backend = backend
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self._function: Optional[EmbeddingFunction] = None
+        self._lock = threading.Lock()
+
+    @property
+    def function(self) -> EmbeddingFunction:
+        if self._function is None:
+            with self._lock:
+                if self._function is None:
+                    self._function = _FACTORIES[self.backend](self.model)
+        return self._function
+
+    def __call__(self, input: Documents) -> Embeddings:
+        function = self.function
+        embeddings: List = []
+        for start in range(0, len(input), self.batch_size):
+            embeddings.extend(function(input[start:start + self.batch_size]))
+        return embeddings
+
+
+_functions: Dict[Tuple[str, str], LazyEmbeddingFunction] = {}
+_functions_lock = threading.Lock()
+
+
+def get_embedding_function(backend: str = EMBEDDING_BACKEND, model: str = "") -> LazyEmbeddingFunction:
+    """Process-wide embedding function per (backend, model), so models are loaded once."""
+    model = model or DEFAULT_MODELS.get(backend, "")
+    with _functions_lock:
+        function = _functions.get((backend, model))
+        if function is None:
+            function = _functions[(backend, model)] = LazyEmbeddingFunction(backend, model)
+        return function
+
+
+def collection_name(base: str, backend: str = EMBEDDING_BACKEND, model: str = "") -> str:
+    """Chroma collection holding `base` embedded with (backend, model)."""
+    model = model or DEFAULT_MODELS.get(backend, "")
+    if backend == "openai" and model == DEFAULT_MODELS["openai"]:
+        return base
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "-", model.split("/")[-1])
+    return f"{base}__{backend.replace('-', '')}_{slug}"
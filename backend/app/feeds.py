@@ -0,0 +1,180 @@
+"""
+Precomputed tier feeds for the curated and premium galleries.
+
+Tier membership and ranking only change when the judge scripts recompute
+NTILE buckets (or an art is hidden/unhidden), so each worker keeps an ordered
+`(quality_score, id)` snapshot per tier and serves feed pages as slices of it,
+followed by one bulk row fetch.
+
+Snapshots are versioned through the `feed_state` row named `tiers`. Anything
+that changes tier membership calls `bump_feed_version`; the judge scripts bump
+it through app.tiers after their tier recompute. Workers compare versions at most
+every FEED_VERSION_CHECK_SECONDS and rebuild lazily on the next request: one
+request per tier runs the query while the others keep serving the previous
+snapshot (rows are re-checked for is_public when fetched, so a few seconds of
+an old ranking is harmless).
+
+New uploads are unjudged, so they cannot join a tier; they bump the separate
+`content` row instead (`bump_content_version`), which only the cached pages
+that can show them (tier=all) are keyed on. The snapshots and every
+curated/premium page stay warm across uploads.
+"""
+import os
+import time
+import threading
+import logging
+from bisect import bisect_right
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from . import models
+
+logger = logging.getLogger(__name__)
+
+FEED_TIERS = ("curated", "premium")
+FEED_STATE_NAME = "tiers"
+CONTENT_STATE_NAME = "content"
+FEED_VERSION_CHECK_SECONDS = float(os.getenv("FEED_VERSION_CHECK_SECONDS", "30"))
+
+
+def _sort_key(score: Optional[float], art_id: int) -> Tuple:
+    """Ascending key equivalent to `ORDER BY quality_score DESC NULLS LAST, id DESC`."""
+    return (score is None, -(score or 0.0), -art_id)
+
+
+class TierFeed:
+    """Immutable ranking of one tier: parallel lists of sort keys and entries."""
+
+    def __init__(self, tier: str, entries: List[Tuple[Optional[float], int]], version: int):
+        self.tier = tier
+        self.version = version
+        self.entries = entries
+        self.keys = [_sort_key(score, art_id) for score, art_id in entries]
+        self.built_at = time.time()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def page(self, offset: int, limit: int) -> List[Tuple[Optional[float], int]]:
+        return self.entries[offset:offset + limit]
+
+    def after(self, score: Optional[float], art_id: int, limit: int) -> List[Tuple[Optional[float], int]]:
+        """Entries strictly after the cursor key, in feed order."""
+        start = bisect_right(self.keys, _sort_key(score, art_id))
+        return self.entries[start:start + limit]
+
+
+def _tier_column(tier: str):
+    return models.Art.is_premium if tier == "premium" else models.Art.is_curated
+
+
+def _build_feed(db: Session, tier: str, version: int) -> TierFeed:
+    t0 = time.time()
+    rows = (
+        db.query(models.Art.quality_score, models.Art.id)
+        .filter(models.Art.is_public == True, models.Art.src.isnot(None), _tier_column(tier) == True)
+        .order_by(models.Art.quality_score.desc().nullslast(), models.Art.id.desc())
+        .all()
+    )
+    feed = TierFeed(tier, [(score, art_id) for score, art_id in rows], version)
+    logger.info(f"built {tier} feed snapshot v{version}: {len(feed)} arts in {(time.time() - t0) * 1000:.0f}ms")
+    return feed
+
+
+def read_feed_versions(db: Session) -> Dict[str, int]:
+    """Tier snapshot and content versions, one query; 0 for rows not written yet."""
+    rows = db.query(models.FeedState.name, models.FeedState.version).filter(
+        models.FeedState.name.in_((FEED_STATE_NAME, CONTENT_STATE_NAME))
+    ).all()
+    versions = {FEED_STATE_NAME: 0, CONTENT_STATE_NAME: 0}
+    versions.update(rows)
+    return versions
+
+
+def _bump_state(db: Session, name: str) -> None:
+    stmt = pg_insert(models.FeedState.__table__).values(name=name, version=1, updated_at=datetime.utcnow())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.FeedState.name],
+        set_={"version": models.FeedState.version + 1, "updated_at": datetime.utcnow()},
+    )
+    db.execute(stmt)
+    db.commit()
+
+
+def bump_feed_version(db: Session) -> None:
+    """Mark every tier snapshot stale, in this worker and (via feed_state) all others."""
+    _bump_state(db, FEED_STATE_NAME)
+    feed_store.recheck()
+
+
+def bump_content_version(db: Session) -> None:
+    """Mark cached tier=all pages stale after an upload; tier snapshots are kept."""
+    _bump_state(db, CONTENT_STATE_NAME)
+    feed_store.recheck()
+
+
+class FeedStore:
+    """Per-process cache of TierFeed snapshots keyed by tier."""
+
+    def __init__(self):
+        self._feeds: Dict[str, TierFeed] = {}
+        self._version: Optional[int] = None
+        self._content_version = 0
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._build_locks = {tier: threading.Lock() for tier in FEED_TIERS}
+
+    def recheck(self) -> None:
+        """Re-read feed_state on the next request instead of after the check interval."""
+        with self._lock:
+            self._checked_at = 0.0
+
+    def _refresh(self, db: Session) -> None:
+        """Re-read the versions from feed_state at most every FEED_VERSION_CHECK_SECONDS."""
+        now = time.time()
+        if self._version is None or now - self._checked_at >= FEED_VERSION_CHECK_SECONDS:
+            versions = read_feed_versions(db)
+            with self._lock:
+                # Old snapshots stay in place until their rebuild is swapped in
+                self._version = versions[FEED_STATE_NAME]
+                self._content_version = versions[CONTENT_STATE_NAME]
+                self._checked_at = now
+
+    def current_version(self, db: Session) -> int:
+        """Tier snapshot version."""
+        self._refresh(db)
+        return self._version
+
+    def cache_version(self, db: Session, tier: str) -> str:
+        """Version to key cached pages of `tier` on: uploads only reach tier=all."""
+        self._refresh(db)
+        if tier in FEED_TIERS:
+            return str(self._version)
+        return f"{self._version}.{self._content_version}"
+
+    def get(self, db: Session, tier: str) -> TierFeed:
+        version = self.current_version(db)
+        feed = self._feeds.get(tier)
+        if feed is not None and feed.version == version:
+            return feed
+        build_lock = self._build_locks[tier]
+        if feed is None:
+            build_lock.acquire()  # nothing to serve yet: wait for the build in progress
+        elif not build_lock.acquire(blocking=False):
+            return feed  # another request is rebuilding; serve the stale snapshot meanwhile
+        try:
+            feed = self._feeds.get(tier)
+            if feed is not None and feed.version == version:
+                return feed  # built while this request waited
+            feed = _build_feed(db, tier, version)
+            with self._lock:
+                self._feeds[tier] = feed
+            return feed
+        finally:
+            build_lock.release()
+
+
+feed_store = FeedStore()
@@ -0,0 +1,70 @@
+"""
+Conditional GET helpers: weak ETags, If-None-Match handling and Cache-Control.
+
+ETags are derived from the version of the result set rather than a hash of the
+rendered body: for art lists that is each art's id, num_likes, quality score
+and the viewer's like flag, plus a scope (endpoint parameters, feed version).
+A 304 then tells browsers and the Vercel edge to reuse their copy instead of
+re-downloading hundreds of art objects per scroll.
+"""
+import hashlib
+import json
+from typing import Iterable, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from .serialization import FastJSONResponse
+
+# Shared caches may keep anonymous pages briefly; personalised pages must revalidate
+PUBLIC_FEED_CACHE = "public, max-age=30, s-maxage=60, stale-while-revalidate=120"
+PUBLIC_DETAIL_CACHE = "public, max-age=60, s-maxage=300, stale-while-revalidate=600"
+PUBLIC_STATIC_CACHE = "public, max-age=300, s-maxage=3600, stale-while-revalidate=86400"
+PRIVATE_CACHE = "private, no-cache"
+
+
+def weak_etag(*parts) -> str:
+    digest = hashlib.sha1(json.dumps(parts, default=str, separators=(",", ":")).encode()).hexdigest()
+    return f'W/"{digest[:24]}"'
+
+
+def art_list_etag(items: Iterable[dict], *scope) -> str:
+    """Weak ETag for a list of art dicts, changing whenever any art's likes, score or like flag does."""
+    versions = [
+        (item["id"], item.get("num_likes"), item.get("quality_score"), item.get("is_public"), item.get("liked_by_user"))
+        for item in items
+    ]
+    return weak_etag(scope, versions)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison against If-None-Match, as RFC 9110 requires for GET."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+
+def conditional_json(
+    request: Request,
+    content,
+    etag: str,
+    cache_control: str,
+    headers: Optional[dict] = None,
+) -> Response:
+    """304 when the client already holds `etag`, otherwise the JSON body; both carry the caching headers."""
+    all_headers = {"ETag": etag, "Cache-Control": cache_control}
+    if headers:
+        all_headers.update(headers)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=all_headers)
+    return FastJSONResponse(content=content, headers=all_headers)
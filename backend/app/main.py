@@ -9,6 +9,8 @@ import uuid
 from PIL import Image
 from pathlib import Path
 import asyncio
+import anyio
+import os
 from threading import Thread
 import json
 # from .services.scraper_service import router as scraper_router, run_scraper
@@ -37,6 +39,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"], 
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Search-Path", "Server-Timing"],
 )
 
 app.include_router(arts.router)
@@ -60,14 +63,41 @@ app.include_router(credits.router)
 #     print("Scraper started in background")
 # Print ChromaDB collection sizes
 @app.get("/chroma-stats", tags=["debug"])
-async def get_chroma_stats():
-    from .chroma_services import collection_prompts, collection_categories
+def get_chroma_stats():
+    from .chroma_services import chroma, collection_prompts, collection_categories
     
     return {
         "prompts_collection_size": collection_prompts.count() if collection_prompts else 0,
-        "categories_collection_size": collection_categories.count() if collection_categories else 0
+        "categories_collection_size": collection_categories.count() if collection_categories else 0,
+        "query_embedding_cache": chroma.query_cache.stats(),
     }
 
+@app.get("/cache-stats", tags=["debug"])
+def get_cache_stats():
+    from .cache import response_cache
+    from .suggest import suggestion_index
+
+    return {**response_cache.stats(), "suggestions": suggestion_index.stats()}
+
+@app.get("/search-stats", tags=["debug"])
+def get_search_stats():
+    from .search import search_metrics
+
+    return search_metrics.stats()
+
+@app.on_event("startup")
+async def configure_threadpool():
+    # Sync routes (and get_db) run on anyio worker threads; 40 by default
+    threadpool_size = int(os.getenv("THREADPOOL_SIZE", "0"))
+    if threadpool_size > 0:
+        anyio.to_thread.current_default_thread_limiter().total_tokens = threadpool_size
+
+@app.on_event("startup")
+async def start_suggestion_index():
+    # Built off the request path on a daemon thread that keeps refreshing it
+    from .suggest import suggestion_index
+    suggestion_index.start()
+
 '''
 from .chroma_services import *
 
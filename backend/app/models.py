@@ -1,5 +1,6 @@
-from sqlalchemy import Boolean, Column, Float, ForeignKey, Integer, String, DateTime, Table, TIMESTAMP, text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, Computed, Float, ForeignKey, Index, Integer, String, DateTime, Table, TIMESTAMP, text
+from sqlalchemy.dialects.postgresql import ARRAY, REAL, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from .database import Base
 from datetime import datetime
 
@@ -8,6 +9,12 @@ art_categories = Table('art_categories', Base.metadata,
     Column('category_id', Integer, ForeignKey('categories.id'), primary_key=True)
 )
 
+# Full-text document of an art: prompt ranks above the generated description
+ART_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(prompt, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(descriptive_prompt, '')), 'B')"
+)
+
 class User(Base):
     __tablename__ = "users"
 
@@ -54,6 +61,8 @@ class Art(Base):
     is_premium = Column(Boolean, default=False, nullable=False)
     judge_notes = Column(String, nullable=True)
     judged_at = Column(DateTime, nullable=True)
+    # Generated by Postgres on insert/update; deferred so entity loads don't carry it
+    search_vector = deferred(Column(TSVECTOR, Computed(ART_SEARCH_VECTOR_SQL, persisted=True)))
 
     owner = relationship("User", back_populates="arts")
     likes = relationship("Like", back_populates="art")
@@ -61,6 +70,21 @@ class Art(Base):
     categories = relationship("Category", secondary=art_categories, back_populates="arts")
     art_metadata = relationship("ArtMetadata", back_populates="art", uselist=False)
 
+    # Mirrors alembic revisions 4b8e2f6c1a7d and 7c3d9e1f2b4a; one index per router access path
+    __table_args__ = (
+        Index("ix_arts_public_quality", quality_score.desc().nullslast(), id.desc(),
+              postgresql_where=text("is_public")),
+        Index("ix_arts_curated_quality", quality_score.desc().nullslast(), id.desc(),
+              postgresql_where=text("is_public AND is_curated")),
+        Index("ix_arts_premium_quality", quality_score.desc().nullslast(), id.desc(),
+              postgresql_where=text("is_public AND is_premium")),
+        Index("ix_arts_owner_public_date", owner_id, date.desc(), id.desc(),
+              postgresql_where=text("is_public")),
+        Index("ix_arts_owner_generated_date", owner_id, date.desc(), id.desc(),
+              postgresql_where=text("is_generated")),
+        Index("ix_arts_search_vector", search_vector, postgresql_using="gin"),
+    )
+
 class SearchHistory(Base):
     __tablename__ = "search_history"
     
@@ -91,6 +115,9 @@ class Like(Base):
     user = relationship("User", back_populates="likes")
     art = relationship("Art", back_populates="likes")
 
+    # The (user_id, art_id) primary key cannot serve lookups by art_id alone
+    __table_args__ = (Index("ix_likes_art_id", art_id),)
+
 class Follow(Base):
     __tablename__ = "follows"
     
@@ -139,3 +166,22 @@ class CreditLedger(Base):
     reason = Column(String, nullable=False)            # 'purchase', 'generation', 'refund', 'admin'
     external_ref = Column(String, index=True)          # LemonSqueezy order id, etc. (idempotency)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+class FeedState(Base):
+    """Version counters for precomputed feeds; bumped whenever tier membership changes."""
+    __tablename__ = "feed_state"
+    name = Column(String, primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ArtNeighbor(Base):
+    """Precomputed "more like this" list of an art: nearest Prompts vectors, closest first.
+
+    Written by app/scripts/build_art_neighbors.py; neighbor_ids[i] is at cosine
+    distance distances[i]. Visibility is not baked in and is checked when served.
+    """
+    __tablename__ = "art_neighbors"
+    art_id = Column(Integer, ForeignKey("arts.id", ondelete="CASCADE"), primary_key=True)
+    neighbor_ids = Column(ARRAY(Integer), nullable=False)
+    distances = Column(ARRAY(REAL), nullable=False)
+    computed_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,120 @@
+"""
+Opaque keyset cursors for list endpoints.
+
+A cursor is the sort key of the last row on the previous page, serialized as
+url-safe base64 JSON. The next page is a seek (`WHERE key < cursor`) on a
+composite index instead of an OFFSET scan, so deep scrolls cost the same as
+the first page.
+
+Cursors are returned in the `X-Next-Cursor` response header so list bodies
+stay plain JSON arrays for older clients.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Profile / liked / generated galleries
+GALLERY_PAGE_SIZE = 60
+GALLERY_MAX_PAGE_SIZE = 200
+
+# Search result pages
+SEARCH_PAGE_SIZE = 100
+SEARCH_MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(*values) -> str:
+    raw = json.dumps(list(values), separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> Tuple:
+    """Decode a cursor into a tuple of `size` values; 400 on anything malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return tuple(values)
+
+
+def quality_cursor(cursor: str) -> Tuple[Optional[float], int]:
+    """Decode a `(quality_score, id)` cursor."""
+    score, art_id = decode_cursor(cursor, 2)
+    try:
+        return (None if score is None else float(score)), int(art_id)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def after_quality_key(score_col, id_col, score: Optional[float], art_id: int):
+    """Seek predicate for `ORDER BY score DESC NULLS LAST, id DESC`, within one phase.
+
+    The feed has two phases: scored rows, then the NULL-score tail. A cursor
+    with a score seeks with a row comparison `(score, id) < (s, i)`, which
+    Postgres turns into an Index Cond on the (score, id) index; NULL scores
+    never satisfy it, so once that phase runs out the caller continues with
+    `score IS NULL ORDER BY id DESC`. A cursor with a NULL score is already
+    in the tail.
+    """
+    if score is None:
+        return and_(score_col.is_(None), id_col < art_id)
+    return tuple_(score_col, id_col) < tuple_(score, art_id)
+
+
+def date_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """Decode a `(date, id)` cursor."""
+    value, art_id = decode_cursor(cursor, 2)
+    try:
+        return (None if value is None else datetime.fromisoformat(value)), int(art_id)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_date_cursor(value: Optional[datetime], art_id: int) -> str:
+    return encode_cursor(None if value is None else value.isoformat(), art_id)
+
+
+def after_date_key(date_col, id_col, value: Optional[datetime], art_id: int):
+    """Seek predicate for `ORDER BY date DESC, id DESC`, within one phase.
+
+    Postgres sorts NULLs first in a DESC order (and so does the gallery
+    index), so a gallery is the NULL-date head followed by the dated rows. A
+    dated cursor seeks with a row comparison `(date, id) < (d, i)` (an Index
+    Cond on the gallery index); a cursor inside the head seeks within it and
+    the caller continues with `date IS NOT NULL` once the head runs out.
+    """
+    if value is None:
+        return and_(date_col.is_(None), id_col < art_id)
+    return tuple_(date_col, id_col) < tuple_(value, art_id)
+
+
+def rank_cursor(cursor: str) -> Tuple[int, int]:
+    """Decode a `(position, id)` cursor into a ranked id list such as search results."""
+    position, art_id = decode_cursor(cursor, 2)
+    try:
+        return max(0, int(position)), int(art_id)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def resume_position(ranked_ids: List[int], position: int, art_id: int) -> int:
+    """Where the page after `art_id` starts in `ranked_ids`.
+
+    The position is trusted while the id before it is still `art_id`; if the
+    list was recomputed since (TTL expiry, feed version bump) the page resumes
+    right after `art_id`, or at the old position when that id is gone.
+    """
+    if 0 < position <= len(ranked_ids) and ranked_ids[position - 1] == art_id:
+        return position
+    try:
+        return ranked_ids.index(art_id) + 1
+    except ValueError:
+        return position
@@ -1,6 +1,7 @@
 import boto3
 from botocore.client import Config
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
 from .config import R2_ACCESS_KEY_ID, R2_SECRET_ACCESS_KEY, R2_ENDPOINT_URL, R2_BUCKET_NAME, R2_PUBLIC_URL
 import io
 
@@ -13,41 +14,37 @@ s3 = boto3.client(
     config=Config(signature_version='s3v4')
 )
 
+def _put_fileobj(fileobj, filename: str, content_type: str) -> str:
+    s3.upload_fileobj(
+        fileobj,
+        R2_BUCKET_NAME,
+        filename,
+        ExtraArgs={
+            'ContentType': content_type
+        }
+    )
+    return f"{R2_PUBLIC_URL}/{filename}"
+
 async def upload_image_to_r2(image: UploadFile, filename: str) -> str:
     try:
-        # Use upload_fileobj for UploadFile which provides a file-like object
-        s3.upload_fileobj(
-            image.file, 
-            R2_BUCKET_NAME,
-            filename,
-            ExtraArgs={
-                'ContentType': image.content_type
-            }
-        )
-        image_url = f"{R2_PUBLIC_URL}/{filename}"
-        return image_url
+        # boto3 is blocking; keep the upload off the event loop
+        return await run_in_threadpool(_put_fileobj, image.file, filename, image.content_type)
     except Exception as e:
         print(f"Error uploading {filename} to R2: {str(e)}")
         raise
 
-async def upload_image_bytes_to_r2(image_bytes: bytes, filename: str, content_type: str = 'image/png') -> str:
-    """Uploads raw image bytes to R2."""
+def put_image_bytes_to_r2(image_bytes: bytes, filename: str, content_type: str = 'image/png') -> str:
+    """Uploads raw image bytes to R2 (blocking; for sync routes and scripts)."""
     try:
-        # Use upload_fileobj with BytesIO for raw bytes
-        s3.upload_fileobj(
-            io.BytesIO(image_bytes),
-            R2_BUCKET_NAME,
-            filename,
-            ExtraArgs={
-                'ContentType': content_type
-            }
-        )
-        image_url = f"{R2_PUBLIC_URL}/{filename}"
-        return image_url
+        return _put_fileobj(io.BytesIO(image_bytes), filename, content_type)
     except Exception as e:
         print(f"Error uploading bytes to R2 as {filename}: {str(e)}")
         raise
 
+async def upload_image_bytes_to_r2(image_bytes: bytes, filename: str, content_type: str = 'image/png') -> str:
+    """Uploads raw image bytes to R2 without blocking the event loop."""
+    return await run_in_threadpool(put_image_bytes_to_r2, image_bytes, filename, content_type)
+
 def get_image_from_r2(filename: str):
     """Get an image URL from R2
     
@@ -1,18 +1,44 @@
 from fastapi import APIRouter, Depends, File, UploadFile, Form, HTTPException, Body, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import case, func, text, exists, and_, literal, select
+from sqlalchemy import ARRAY, ColumnElement, Integer, func, text, and_, any_, literal, select, true, update, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from .. import schemas, models
 from typing import List, Optional
 from datetime import datetime
 import uuid
-from PIL import Image
+import random
+import asyncio
+from PIL import Image, UnidentifiedImageError
 import io
 import hashlib
 from ..chroma_services import *
 from ..config import *
 from ..utils import *
-from ..r2_storage import upload_image_to_r2, upload_image_bytes_to_r2
-from ..chroma_services import collection_prompts
+from ..r2_storage import upload_image_to_r2, put_image_bytes_to_r2
+from ..pagination import (
+    NEXT_CURSOR_HEADER, GALLERY_PAGE_SIZE, GALLERY_MAX_PAGE_SIZE,
+    encode_cursor, quality_cursor, after_quality_key,
+    date_cursor, encode_date_cursor, after_date_key,
+    SEARCH_PAGE_SIZE, SEARCH_MAX_PAGE_SIZE, rank_cursor, resume_position,
+)
+from ..feeds import FEED_TIERS, feed_store, bump_content_version, bump_feed_version
+from ..cache import response_cache
+from ..serialization import ART_CARD_COLUMNS, FastJSONResponse, art_dicts
+from ..text_search import lexical_search, search_terms
+from ..search import (
+    SEARCH_DEGRADED_CACHE_TTL, SEARCH_LEXICAL_DEPTH, SEARCH_MAX_DEPTH, SEARCH_VECTOR_DEPTH, VECTOR_MAX_DISTANCE,
+    SearchOutcome, search_ids_many, vector_ranking,
+)
+from ..suggest import SUGGEST_LIMIT, MAX_SUGGEST_LIMIT, suggestion_index
+from ..services.embedding_service import get_multimodal_service, image_batcher, image_collection
+from ..http_cache import (
+    PUBLIC_FEED_CACHE, PUBLIC_DETAIL_CACHE, PUBLIC_STATIC_CACHE, PRIVATE_CACHE,
+    art_list_etag, weak_etag, conditional_json,
+)
+from ..chroma_services import collection_prompts, prompt_metadata, sync_prompt_metadata
 import numpy as np
 import time
 from app.scripts.enhance_prompts import generate_description
@@ -303,8 +329,8 @@ async def get_generation_status():
 
 @router.post("/arts/", response_model=schemas.Art)
 async def create_art(prompt: str = Form(...), image: UploadFile = File(...), owner_id: int = Form(...), db: Session = Depends(get_db)): 
-    # Validate owner_id exists
-    user = db.query(models.User).filter(models.User.id == owner_id).first()
+    # Validate owner_id exists (sync Session: run it in the threadpool, not on the event loop)
+    user = await run_in_threadpool(db.get, models.User, owner_id)
     if not user:
         raise HTTPException(
             status_code=400,
@@ -357,6 +383,15 @@ async def create_art(prompt: str = Form(...), image: UploadFile = File(...), own
         is_public=True
     )
     
+    return await run_in_threadpool(_store_uploaded_art, db, db_art, prompt, descriptive_prompt)
+
+
+def _store_uploaded_art(db: Session, db_art: models.Art, prompt: str, descriptive_prompt: str) -> dict:
+    """Insert an uploaded art and index it in Chroma (blocking; called through the threadpool).
+
+    Returns the response payload: the commits expire `db_art`, and reloading
+    it while FastAPI serializes would run blocking queries on the event loop.
+    """
     try:
         db.add(db_art)
         db.commit()
@@ -366,7 +401,8 @@ async def create_art(prompt: str = Form(...), image: UploadFile = File(...), own
         if collection_prompts:
             collection_prompts.add(
                 documents=[descriptive_prompt],
-                ids=[str(db_art.id)]
+                ids=[str(db_art.id)],
+                metadatas=[prompt_metadata(db_art)],
             )
 
         # Add categories
@@ -380,11 +416,15 @@ async def create_art(prompt: str = Form(...), image: UploadFile = File(...), own
             db.execute(models.art_categories.insert(), associations)
             db.commit()
 
-        return db_art
+        # New public art shows up in the tier=all feed and search; it is
+        # unjudged, so the curated/premium snapshots and pages stay valid
+        bump_content_version(db)
+        return _art_payload([db_art])[0]
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create art entry: {str(e)}")
 
+
 def _viewer_is_pro(db: Session, viewer_id: Optional[int]) -> bool:
     if not viewer_id:
         return False
@@ -396,12 +436,78 @@ def _viewer_is_pro(db: Session, viewer_id: Optional[int]) -> bool:
     return bool(u.pro_until and u.pro_until > datetime.utcnow())
 
 
-@router.get("/arts/", response_model=List[schemas.Art])
-async def read_arts(
+def _art_id_in(art_ids) -> ColumnElement:
+    """`arts.id = ANY(:ids)`: one array parameter, so the statement is the same for any number of ids."""
+    return models.Art.id == any_(literal(list(art_ids), ARRAY(Integer)))
+
+
+def _fetch_arts_in_order(db: Session, art_ids: List[int], *filters):
+    """Bulk-load public art rows by id in one query and return them in `art_ids` order.
+
+    Every ranked list (feed snapshots, search, vector neighbours) is fetched
+    here: Postgres returns the rows in any order and they are put back in
+    rank order in Python, instead of an ORDER BY CASE over every id.
+    """
+    if not art_ids:
+        return []
+    # is_public is re-checked because a snapshot can lag a set-public call by a few seconds
+    arts = db.query(*ART_CARD_COLUMNS).filter(_art_id_in(art_ids), models.Art.is_public == True, *filters).all()
+    by_id = {art.id: art for art in arts}
+    return [by_id[art_id] for art_id in art_ids if art_id in by_id]
+
+
+def _liked_art_ids(db: Session, viewer_id: Optional[int], art_ids: List[int]) -> set:
+    """Which of `art_ids` the viewer has liked, via one lookup on the likes primary key."""
+    if viewer_id is None or not art_ids:
+        return set()
+    rows = db.query(models.Like.art_id).filter(
+        models.Like.user_id == viewer_id,
+        models.Like.art_id.in_(art_ids),
+    ).all()
+    return {art_id for (art_id,) in rows}
+
+
+def _overlay_likes(db: Session, items: List[dict], viewer_id: Optional[int]) -> List[dict]:
+    """Copy viewer-independent art dicts with the viewer's liked_by_user flag filled in.
+
+    Base pages never carry viewer data, so they can be cached and shared by
+    every viewer; only this overlay is per-user.
+    """
+    liked = _liked_art_ids(db, viewer_id, [item["id"] for item in items])
+    return [{**item, "liked_by_user": item["id"] in liked} for item in items]
+
+
+def _gallery_page(db: Session, q, limit: int, cursor: Optional[str], viewer_id: Optional[int]):
+    """One `(date, id)`-ordered gallery page as dicts with the viewer's likes, plus the next-page headers."""
+    limit = max(1, min(limit, GALLERY_MAX_PAGE_SIZE))
+    order = (models.Art.date.desc(), models.Art.id.desc())
+    if cursor:
+        after_date, after_id = date_cursor(cursor)
+        arts = q.filter(after_date_key(models.Art.date, models.Art.id, after_date, after_id)).order_by(*order).limit(limit).all()
+        if after_date is None and len(arts) < limit:
+            # The NULL-date head ran out on this page: continue with the dated rows
+            arts += q.filter(models.Art.date.isnot(None)).order_by(*order).limit(limit - len(arts)).all()
+    else:
+        arts = q.order_by(*order).limit(limit).all()
+    headers = None
+    if len(arts) == limit:
+        headers = {NEXT_CURSOR_HEADER: encode_date_cursor(arts[-1].date, arts[-1].id)}
+    return _overlay_likes(db, art_dicts(arts), viewer_id), headers
+
+
+def _art_payload(items) -> List[dict]:
+    """Validate full ORM arts once and return JSON-ready dicts (detail views; lists use art_dicts)."""
+    return [jsonable_encoder(schemas.Art.model_validate(item)) for item in items]
+
+
+@router.get("/arts/", response_model=List[schemas.ArtCard])
+def read_arts(
+    request: Request,
     limit: int = 100,
     page: int = 1,
     tier: str = "curated",
     viewer_id: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
 ):
     """Tier-aware art feed.
@@ -409,6 +515,9 @@ async def read_arts(
     tier=curated  - top ~30% by quality_score (free, default)
     tier=premium  - top ~5% (requires Pro user; non-Pro viewer gets 402)
     tier=all      - no quality filter (admin / debug)
+
+    Pass the `X-Next-Cursor` header of the previous response as `cursor` to
+    seek to the next page; `page` is still honoured for older clients.
     """
     tier = (tier or "curated").lower()
     page = max(1, page)
@@ -416,449 +525,563 @@ async def read_arts(
     offset = (page - 1) * limit
     is_pro = _viewer_is_pro(db, viewer_id)
 
-    # Base filter: is_public + non-empty src + judged
-    base_filter = and_(models.Art.is_public == True, models.Art.src.isnot(None))
+    if tier == "premium" and not is_pro:
+        raise HTTPException(status_code=402, detail={
+            "code": "pro_required",
+            "message": "Premium gallery requires Pro access. Buy a credit pack to unlock.",
+        })
 
-    if tier == "premium":
-        if not is_pro:
-            raise HTTPException(status_code=402, detail={
-                "code": "pro_required",
-                "message": "Premium gallery requires Pro access. Buy a credit pack to unlock.",
-            })
-        tier_filter = models.Art.is_premium == True
-    elif tier == "all":
-        tier_filter = None
-    else:  # curated
-        tier_filter = models.Art.is_curated == True
-
-    q = db.query(
-        models.Art,
-        (case((models.Like.user_id == viewer_id, True), else_=False).label("liked_by_user")
-            if viewer_id is not None else literal(False).label("liked_by_user")),
+    # Base pages are identical for every viewer; key on the feed version so a
+    # judge re-run, visibility change or (for tier=all) upload never serves an old page
+    version = feed_store.cache_version(db, tier)
+
+    def compute():
+        arts, next_cursor = _read_feed_page(db, tier, offset, limit, cursor)
+        return {"items": art_dicts(arts), "next_cursor": next_cursor}
+
+    page_data = response_cache.get_or_set("feed", (tier, None if cursor else offset, limit, cursor, version), compute)
+    items = _overlay_likes(db, page_data["items"], viewer_id)
+    headers = {NEXT_CURSOR_HEADER: page_data["next_cursor"]} if page_data["next_cursor"] else None
+    return conditional_json(
+        request, items,
+        art_list_etag(items, "feed", tier, offset, limit, cursor, version, viewer_id),
+        PUBLIC_FEED_CACHE if viewer_id is None else PRIVATE_CACHE,
+        headers=headers,
     )
-    if viewer_id is not None:
-        q = q.outerjoin(models.Like, and_(models.Like.art_id == models.Art.id, models.Like.user_id == viewer_id))
-    q = q.filter(base_filter)
+
+
+def _read_feed_page(db: Session, tier: str, offset: int, limit: int, cursor: Optional[str]):
+    """One feed page of projected art rows plus the cursor of the following page."""
+    if tier in FEED_TIERS:
+        # Curated/premium pages are slices of the precomputed ranking
+        feed = feed_store.get(db, tier)
+        entries = feed.after(*quality_cursor(cursor), limit) if cursor else feed.page(offset, limit)
+        arts = _fetch_arts_in_order(db, [art_id for _, art_id in entries])
+        next_cursor = encode_cursor(*entries[-1]) if len(entries) == limit else None
+        return arts, next_cursor
+
+    # Base filter: is_public + non-empty src
+    base_filter = and_(models.Art.is_public == True, models.Art.src.isnot(None))
+    tier_filter = None if tier == "all" else models.Art.is_curated == True
+
+    q = db.query(*ART_CARD_COLUMNS).filter(base_filter)
     if tier_filter is not None:
         q = q.filter(tier_filter)
     # Order by quality if available, else by id desc as fallback (newest first)
-    q = q.order_by(models.Art.quality_score.desc().nullslast(), models.Art.id.desc()).offset(offset).limit(limit)
-    rows = q.all()
+    order = (models.Art.quality_score.desc().nullslast(), models.Art.id.desc())
+    if cursor:
+        after_score, after_id = quality_cursor(cursor)
+        arts = q.filter(
+            after_quality_key(models.Art.quality_score, models.Art.id, after_score, after_id)
+        ).order_by(*order).limit(limit).all()
+        if after_score is not None and len(arts) < limit:
+            # Scored rows ran out on this page: continue with the NULL-score tail
+            arts += q.filter(models.Art.quality_score.is_(None)).order_by(
+                models.Art.id.desc()
+            ).limit(limit - len(arts)).all()
+    else:
+        arts = q.order_by(*order).offset(offset).limit(limit).all()
 
-    return [{**art.__dict__, "liked_by_user": liked} for art, liked in rows]
+    next_cursor = None
+    if len(arts) == limit:
+        next_cursor = encode_cursor(arts[-1].quality_score, arts[-1].id)
+    return arts, next_cursor
 
 @router.get("/arts/dates/", response_model=List[str])
-async def read_art_dates(db: Session = Depends(get_db)):
+def read_art_dates(db: Session = Depends(get_db)):
     art_dates = db.query(models.Art.date).all()
     dates = [art_date[0].strftime("%Y-%m-%d %H:%M:%S") for art_date in art_dates]
     return dates
 
-@router.get("/arts/search/", response_model=List[schemas.Art])
-async def search_arts(
+@router.get("/arts/search/", response_model=List[schemas.ArtCard])
+def search_arts(
     query: str,
     user_id: Optional[int] = None,
     tier: str = "curated",
+    limit: int = SEARCH_PAGE_SIZE,
+    page: int = 1,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
 ):
-    """Search with tier-aware filtering (matches /arts/ semantics)."""
+    """Search with tier-aware filtering (matches /arts/ semantics).
+
+    The ranked id list for (query, tier) is computed once and cached; every
+    page is a slice of it. Only a page past its end searches again, with
+    deeper source lists, and that longer list is cached too. Pass
+    the `X-Next-Cursor` header of the previous response as `cursor`, or use
+    `page` like the feed.
+    """
     tier = (tier or "curated").lower()
     if tier == "premium" and not _viewer_is_pro(db, user_id):
         raise HTTPException(status_code=402, detail={
             "code": "pro_required",
             "message": "Premium gallery requires Pro access. Buy a credit pack to unlock.",
         })
+    limit = max(1, min(limit, SEARCH_MAX_PAGE_SIZE))
+
+    normalized = normalize_query(query)
+    version = feed_store.cache_version(db, tier)
+    rankings, server_timing = _search_rankings(db, [normalized], tier, version)
+    ranking = rankings[normalized]
+    if cursor:
+        position, last_id = rank_cursor(cursor)
+    else:
+        position = (max(1, page) - 1) * limit
+    # Only a later page reaching past the cached ranking pays for deeper source lists
+    depth = max(SEARCH_VECTOR_DEPTH, SEARCH_LEXICAL_DEPTH)
+    while position and position + limit > len(ranking["ids"]) and ranking.get("more") and depth < SEARCH_MAX_DEPTH:
+        depth = min(depth * 4, SEARCH_MAX_DEPTH)
+        deeper, deeper_timing = _search_rankings(db, [normalized], tier, version, depth)
+        ranking = _extend_ranking(ranking, deeper[normalized], depth)
+        server_timing = deeper_timing or server_timing
+    ranked_ids = ranking["ids"]
+    start = resume_position(ranked_ids, position, last_id) if cursor else position
+    page_ids = ranked_ids[start:start + limit]
+    items = response_cache.get_or_set(
+        "search", ("page", tier, page_ids, version),
+        lambda: art_dicts(_fetch_arts_in_order(db, page_ids, *_tier_filters(tier))),
+    )
+    headers = _search_headers(ranking["path"], server_timing)
+    if page_ids and (start + limit < len(ranked_ids) or ranking.get("more")):
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(start + len(page_ids), page_ids[-1])
+    return FastJSONResponse(_overlay_likes(db, items, user_id), headers=headers)
+
+
+@router.get("/arts/search/suggest", response_model=List[str])
+async def suggest_search_terms(q: str = "", limit: int = SUGGEST_LIMIT):
+    """Search-as-you-type completions for `q`, served from the in-memory prefix index (app/suggest.py)."""
+    limit = max(1, min(limit, MAX_SUGGEST_LIMIT))
+    return FastJSONResponse(
+        suggestion_index.suggest(q, limit),
+        headers={"Cache-Control": PUBLIC_FEED_CACHE},
+    )
 
-    def _apply_tier(q):
-        if tier == "premium":
-            return q.filter(models.Art.is_premium == True)
-        if tier == "all":
-            return q
-        return q.filter(models.Art.is_curated == True)
 
-    # Check if ChromaDB is available
-    if not collection_prompts:
-        try:
-            q = db.query(models.Art).filter(
-                models.Art.prompt.ilike(f'%{query}%')
-            ).filter(models.Art.is_public == True)
-            q = _apply_tier(q)
-            arts = q.order_by(models.Art.quality_score.desc().nullslast()).limit(100).all()
-            return [schemas.Art.model_validate(art.__dict__) for art in arts]
-        except Exception as e:
-            print(f"Database error in fallback search: {e}")
-            return []
-    
+def _tier_filters(tier: str) -> list:
+    if tier == "premium":
+        return [models.Art.is_premium == True]
+    if tier == "all":
+        return []
+    return [models.Art.is_curated == True]
+
+
+def _tier_where(tier: str) -> dict:
+    """_tier_filters() (plus is_public) as a Chroma metadata filter on Prompts."""
+    conditions = [{"is_public": True}]
+    if tier == "premium":
+        conditions.append({"is_premium": True})
+    elif tier != "all":
+        conditions.append({"is_curated": True})
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+def _search_art_id_lists(db: Session, queries: List[str], tier: str, depth: Optional[int] = None) -> SearchOutcome:
+    """Hybrid vector + full-text ranking per query (see app/search.py), narrowed to public arts of the tier."""
+    filters = _tier_filters(tier)
+    depths = {"vector_depth": depth, "lexical_depth": depth, "limit": 2 * depth} if depth else {}
     try:
-        results = collection_prompts.query(query_texts=[query], include=["distances"], n_results=100)  
-        filtered_ids = results['ids'][0]
-        
-        if not filtered_ids:
-            return []
-        
-        # Create a case statement for ordering results according to ChromaDB ranking
-        order_case = case({id_: index for index, id_ in enumerate(filtered_ids)}, value=models.Art.id)
-        
-        if user_id is not None:
-            # Query arts with liked_by_user information in a single query
-            arts_with_likes_data = db.query(
-                models.Art,
-                case((models.Like.user_id == user_id, True), else_=False).label('liked_by_user')
-            ).outerjoin(
-                models.Like, and_(models.Like.art_id == models.Art.id, models.Like.user_id == user_id)
-            ).filter(
-                models.Art.id.in_(filtered_ids)
-            ).filter(models.Art.is_public == True).order_by(order_case).all()
-            
-            return [
-                {**art.__dict__, "liked_by_user": liked_by_user}
-                for art, liked_by_user in arts_with_likes_data
-            ]
-        else:
-            # Query without liked_by_user information
-            arts = db.query(models.Art).filter(models.Art.id.in_(filtered_ids)).filter(models.Art.is_public == True).order_by(order_case).all()
-            return [schemas.Art.model_validate(art) for art in arts]
+        outcome = search_ids_many(queries, filters, _tier_where(tier), **depths)
     except Exception as e:
-        print(f"Database error in ChromaDB search: {e}")
-        # Fallback to basic text search on database error
-        try:
-            arts = db.query(models.Art).filter(
-                models.Art.prompt.ilike(f'%{query}%')
-            ).filter(models.Art.is_public == True).limit(100).all()
-            return [schemas.Art.model_validate(art.__dict__) for art in arts]
-        except Exception as fallback_error:
-            print(f"Fallback search also failed: {fallback_error}")
-            return []
-
-@router.get("/arts/{user_id}", response_model=List[schemas.Art])
-def get_user_arts(user_id: int, viewer_id: Optional[int] = None, limit: int = 1000, db: Session = Depends(get_db)):
-    arts = db.query(models.Art).filter(models.Art.owner_id == user_id).filter(models.Art.is_public == True).order_by(models.Art.date.desc()).limit(limit).all()
-    # Query arts with liked_by_user information in a single query
-    if viewer_id is not None:
-        arts_with_likes_data = db.query(
-            models.Art,
-            exists().where(
-                and_(
-                    models.Like.art_id == models.Art.id,
-                    models.Like.user_id == viewer_id
-                )
-            ).label('liked_by_user')
-        ).filter(models.Art.id.in_([art.id for art in arts])).all()
-        
-        arts_with_likes = [
-            {
-                **art.__dict__,
-                "liked_by_user": liked_by_user
-            }
-            for art, liked_by_user in arts_with_likes_data
-        ]
-    else:
-        # Query arts without liked_by_user information
-        arts_with_likes = [
-            {
-                **art.__dict__,
-                "liked_by_user": False
-            }
-            for art in arts
-        ]
-    return arts_with_likes
-
-@router.get("/arts/similar/{art_id}", response_model=List[schemas.Art])
-async def get_similar_arts(art_id: int, viewer_id: Optional[int] = None, db: Session = Depends(get_db)):
+        print(f"Search failed for {queries!r}: {e}")
+        return SearchOutcome([[] for _ in queries], "none", {}, True)
+    candidates = {art_id for ranking in outcome.rankings for art_id in ranking}
+    if not candidates:
+        return outcome
+    # Chroma metadata can trail the database by a judge run; the database decides
+    visible = {
+        art_id for (art_id,) in db.query(models.Art.id).filter(
+            _art_id_in(candidates), models.Art.is_public == True, *filters
+        )
+    }
+    return outcome._replace(rankings=[[art_id for art_id in ranking if art_id in visible] for ranking in outcome.rankings])
+
+
+def _search_rankings(db: Session, queries: List[str], tier: str, version: str, depth: Optional[int] = None):
+    """Cached `{"ids", "path", "more"}` ranking per normalized query; the misses are searched together.
+
+    `depth` overrides the per-source list depth (deeper result pages); `more`
+    is whether a deeper search could find further ids. Also returns a
+    Server-Timing value for the sources that ran, or None when everything came
+    from the cache. Rankings missing a source (over budget, failed or
+    saturated) are cached briefly so the next request tries the full search
+    again; when no source answered at all nothing is cached.
+    """
+    rankings = {}
+    for query in queries:
+        if query not in rankings:
+            rankings[query] = response_cache.get("search", _ranking_key(query, tier, version, depth))
+    missing = [query for query, ranking in rankings.items() if ranking is None]
+    if not missing:
+        return rankings, None
+    outcome = _search_art_id_lists(db, missing, tier, depth)
+    ttl = SEARCH_DEGRADED_CACHE_TTL if outcome.degraded else None
+    more = outcome.more or [False] * len(missing)
+    for query, ranked_ids, more_ids in zip(missing, outcome.rankings, more):
+        rankings[query] = {"ids": ranked_ids, "path": outcome.path, "more": more_ids}
+        if outcome.path != "none":
+            response_cache.set("search", _ranking_key(query, tier, version, depth), rankings[query], ttl=ttl)
+    return rankings, ", ".join(f"{source};dur={ms:.1f}" for source, ms in outcome.timings_ms.items())
+
+
+def _ranking_key(query: str, tier: str, version: str, depth: Optional[int]) -> tuple:
+    return ("ranking", query, tier, version) if depth is None else ("ranking", query, tier, version, depth)
+
+
+def _extend_ranking(ranking: dict, deeper: dict, depth: int) -> dict:
+    """`ranking` followed by the ids only the deeper search found, so pages already served keep their ids."""
+    seen = set(ranking["ids"])
+    return {
+        "ids": ranking["ids"] + [art_id for art_id in deeper["ids"] if art_id not in seen],
+        "path": deeper["path"],
+        "more": deeper.get("more", False) and depth < SEARCH_MAX_DEPTH,
+    }
+
+
+def _search_headers(path: str, server_timing: Optional[str]) -> dict:
+    """Which search path produced the ranking, and per-source timings when it was computed now."""
+    headers = {"X-Search-Path": path}
+    if server_timing:
+        headers["Server-Timing"] = server_timing
+    return headers
+
+
+@router.post("/arts/search/batch", response_model=List[schemas.SearchBatchResult])
+def search_arts_batch(body: schemas.SearchBatchRequest, db: Session = Depends(get_db)):
+    """First page of several searches at once.
+
+    Rankings missing from the search cache are computed together (one
+    embedding call, one multi-query Chroma request) and cached for
+    /arts/search/ too; the rows of every result are loaded in one query.
+    """
+    tier = (body.tier or "curated").lower()
+    if tier == "premium" and not _viewer_is_pro(db, body.user_id):
+        raise HTTPException(status_code=402, detail={
+            "code": "pro_required",
+            "message": "Premium gallery requires Pro access. Buy a credit pack to unlock.",
+        })
+    limit = max(1, min(body.limit, SEARCH_MAX_PAGE_SIZE))
+
+    version = feed_store.cache_version(db, tier)
+    normalized = [normalize_query(query) for query in body.queries]
+    rankings, server_timing = _search_rankings(db, normalized, tier, version)
+
+    page_ids = list(dict.fromkeys(art_id for ranking in rankings.values() for art_id in ranking["ids"][:limit]))
+    items = _overlay_likes(db, art_dicts(_fetch_arts_in_order(db, page_ids, *_tier_filters(tier))), body.user_id)
+    by_id = {item["id"]: item for item in items}
+    paths = sorted({ranking["path"] for ranking in rankings.values()})
+    return FastJSONResponse([
+        {
+            "query": query,
+            "items": [by_id[art_id] for art_id in rankings[key]["ids"][:limit] if art_id in by_id],
+        }
+        for query, key in zip(body.queries, normalized)
+    ], headers=_search_headers(",".join(paths), server_timing))
+
+
+MAX_SEARCH_IMAGE_BYTES = 10 * 1024 * 1024
+
+
+@router.post("/arts/search/by-image", response_model=List[schemas.ArtCard])
+async def search_arts_by_image(
+    image: UploadFile = File(...),
+    tier: str = Form("curated"),
+    limit: int = Form(SEARCH_PAGE_SIZE),
+    user_id: Optional[int] = Form(None),
+    db: Session = Depends(get_db),
+):
+    """Arts whose image is closest to the uploaded one (CLIP embeddings, see services/embedding_service.py)."""
+    tier = (tier or "curated").lower()
+    if tier == "premium" and not await run_in_threadpool(_viewer_is_pro, db, user_id):
+        raise HTTPException(status_code=402, detail={
+            "code": "pro_required",
+            "message": "Premium gallery requires Pro access. Buy a credit pack to unlock.",
+        })
+    limit = max(1, min(limit, SEARCH_MAX_PAGE_SIZE))
+
+    image_data = await image.read()
+    if not image_data:
+        raise HTTPException(status_code=400, detail="Empty image")
+    if len(image_data) > MAX_SEARCH_IMAGE_BYTES:
+        raise HTTPException(status_code=413, detail="Image too large")
+    try:
+        service = await run_in_threadpool(get_multimodal_service)
+    except ImportError:
+        raise HTTPException(status_code=503, detail="Image search is not available")
+    try:
+        tensor = await run_in_threadpool(service.preprocess, image_data)
+    except Image.DecompressionBombError:
+        raise HTTPException(status_code=400, detail="Image dimensions too large")
+    except (UnidentifiedImageError, OSError):
+        raise HTTPException(status_code=400, detail="Invalid image")
+    # Concurrent uploads share one forward pass
+    embedding = await asyncio.wrap_future(image_batcher.submit(tensor))
+    return await run_in_threadpool(_image_search_page, db, embedding, tier, limit, user_id)
+
+
+def _image_search_page(db: Session, embedding: List[float], tier: str, limit: int, user_id: Optional[int]):
+    collection = image_collection(create=False)
+    art_ids = []
+    if collection is not None:
+        results = collection.query(
+            query_embeddings=[embedding], n_results=limit, where=_tier_where(tier), include=["distances"],
+        )
+        art_ids = vector_ranking(results["ids"][0], results["distances"][0])
+    items = art_dicts(_fetch_arts_in_order(db, art_ids, *_tier_filters(tier)))
+    return FastJSONResponse(_overlay_likes(db, items, user_id), headers={"X-Search-Path": "image"})
+
+
+@router.get("/arts/{user_id}", response_model=List[schemas.ArtCard])
+def get_user_arts(
+    request: Request,
+    user_id: int,
+    viewer_id: Optional[int] = None,
+    limit: int = GALLERY_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """A user's public arts, newest first; follow `X-Next-Cursor` for older pages."""
+    q = db.query(*ART_CARD_COLUMNS).filter(
+        models.Art.owner_id == user_id,
+        models.Art.is_public == True,
+    )
+    items, headers = _gallery_page(db, q, limit, cursor, viewer_id)
+    return conditional_json(
+        request, items,
+        art_list_etag(items, "user", user_id, limit, cursor, viewer_id),
+        PUBLIC_FEED_CACHE if viewer_id is None else PRIVATE_CACHE,
+        headers=headers,
+    )
+
+@router.get("/arts/similar/{art_id}", response_model=List[schemas.ArtCard])
+def get_similar_arts(art_id: int, viewer_id: Optional[int] = None, db: Session = Depends(get_db)):
     """Get semantically similar arts based on prompt embedding"""
-    source_art = db.query(models.Art).filter(models.Art.id == art_id).first()
+    items = response_cache.get_or_set(
+        "similar", (art_id, feed_store.current_version(db)),
+        lambda: art_dicts(_similar_arts(db, art_id)),
+    )
+    return FastJSONResponse(_overlay_likes(db, items, viewer_id))
+
+
+# Size of the keyword / random fallbacks of _similar_arts
+SIMILAR_FALLBACK_COUNT = 20
+
+
+def _random_public_arts(db: Session, count: int, *filters):
+    """Up to `count` public arts starting at a random id.
+
+    Two primary-key seeks (min/max, then a range scan from a random point,
+    wrapping around) instead of ORDER BY random(), which sorts the whole table.
+    The rows are a run of consecutive ids, which is random enough for filler.
+    """
+    if count <= 0:
+        return []
+    low, high = db.query(func.min(models.Art.id), func.max(models.Art.id)).one()
+    if low is None:
+        return []
+    start = random.randint(low, high)
+    q = db.query(*ART_CARD_COLUMNS).filter(models.Art.is_public == True, *filters)
+    rows = q.filter(models.Art.id >= start).order_by(models.Art.id).limit(count).all()
+    if len(rows) < count:
+        rows += q.filter(models.Art.id < start).order_by(models.Art.id).limit(count - len(rows)).all()
+    return rows
+
+
+def _precomputed_similar_arts(db: Session, art_id: int):
+    """The art's stored neighbour list (see build_art_neighbors) joined to its public arts, closest first."""
+    neighbor = func.unnest(models.ArtNeighbor.neighbor_ids, models.ArtNeighbor.distances).table_valued(
+        "id", "distance", with_ordinality="rank"
+    ).render_derived(name="neighbor")
+    return db.query(*ART_CARD_COLUMNS).select_from(models.ArtNeighbor).join(
+        neighbor, true()
+    ).join(models.Art, models.Art.id == neighbor.c.id).filter(
+        models.ArtNeighbor.art_id == art_id, models.Art.is_public == True,
+        neighbor.c.distance < VECTOR_MAX_DISTANCE,
+    ).order_by(neighbor.c.rank).all()
+
+
+def _similar_arts(db: Session, art_id: int):
+    # Precomputed lists cover every indexed art once the offline job has run;
+    # only arts newer than its last run take the live path below
+    precomputed = _precomputed_similar_arts(db, art_id)
+    if precomputed:
+        return precomputed
+
+    source_art = db.query(models.Art.descriptive_prompt, models.Art.prompt).filter(models.Art.id == art_id).first()
     if not source_art:
         raise HTTPException(status_code=404, detail="Art not found")
     
     prompt = source_art.descriptive_prompt or source_art.prompt
     
     if not prompt:
-        # If no prompt, return random arts with like status
-        if viewer_id is not None:
-            arts_query = db.query(
-                models.Art,
-                exists().where(
-                    and_(
-                        models.Like.art_id == models.Art.id,
-                        models.Like.user_id == viewer_id
-                    )
-                ).label('liked_by_user')
-            ).filter(models.Art.id != art_id).filter(models.Art.is_public == True).limit(20)
-        else:
-            arts_query = db.query(
-                models.Art,
-                literal(False).label('liked_by_user')
-            ).filter(models.Art.id != art_id).filter(models.Art.is_public == True).limit(20)
-            
-        arts_result = arts_query.all()
-        
-        return [
-            {**art.__dict__, "liked_by_user": liked_by_user}
-            for art, liked_by_user in arts_result
-        ]
+        # If no prompt, return random arts
+        return _random_public_arts(db, SIMILAR_FALLBACK_COUNT, models.Art.id != art_id)
 
     try:
         if not collection_prompts:
-            # Fallback to keyword-based similarity if ChromaDB is not available
-            prompt_words = prompt.lower().split() if prompt else []
+            # Fallback to keyword-based similarity if ChromaDB is not available:
+            # one ranked full-text query over the prompt's longer words
+            keywords = search_terms(prompt, min_length=4)
             similar_arts = []
-            
-            if prompt_words:
-                # Find arts with similar keywords
-                for word in prompt_words[:10]:  # Use up to 10 keywords
-                    if len(word) > 3:  # Skip short words
-                        word_arts = db.query(models.Art).filter(
-                            models.Art.prompt.ilike(f'%{word}%')
-                        ).filter(models.Art.id != art_id).filter(
-                            models.Art.is_public == True
-                        ).limit(5).all()  # Get 5 per keyword
-                        similar_arts.extend(word_arts)
-                
-                # Remove duplicates while preserving order
-                seen_ids = set()
-                unique_arts = []
-                for art in similar_arts:
-                    if art.id not in seen_ids:
-                        seen_ids.add(art.id)
-                        unique_arts.append(art)
-                
-                # Take first 20 unique arts
-                similar_arts = unique_arts[:20]
+            if keywords:
+                similar_arts = lexical_search(
+                    db, " ".join(keywords), models.Art.id != art_id, limit=SIMILAR_FALLBACK_COUNT, any_term=True
+                )
             
             # If we don't have enough similar arts, fill with random
-            if len(similar_arts) < 20:
-                remaining_count = 20 - len(similar_arts)
+            if len(similar_arts) < SIMILAR_FALLBACK_COUNT:
                 existing_ids = [art.id for art in similar_arts] + [art_id]
-                
-                random_arts = db.query(models.Art).filter(
-                    models.Art.id.notin_(existing_ids)
-                ).filter(models.Art.is_public == True).order_by(func.random()).limit(remaining_count).all()
-                similar_arts.extend(random_arts)
+                similar_arts.extend(_random_public_arts(
+                    db, SIMILAR_FALLBACK_COUNT - len(similar_arts), models.Art.id.notin_(existing_ids)
+                ))
             
-            # Add liked_by_user information
-            if viewer_id is not None:
-                art_ids = [art.id for art in similar_arts]
-                likes_query = db.query(models.Like.art_id).filter(
-                    models.Like.art_id.in_(art_ids),
-                    models.Like.user_id == viewer_id
-                ).all()
-                liked_art_ids = {like.art_id for like in likes_query}
-                
-                return [
-                    {**art.__dict__, "liked_by_user": art.id in liked_art_ids}
-                    for art in similar_arts
-                ]
-            else:
-                return [
-                    {**art.__dict__, "liked_by_user": False}
-                    for art in similar_arts
-                ]
+            return similar_arts
             
+        # The art's own vector was stored when it was indexed; only arts missing
+        # from Chroma (e.g. generated ones) need their prompt embedded
+        embedding = chroma.stored_embedding(collection_prompts, str(art_id))
+        if embedding is None:
+            embedding = chroma.embed_query(prompt)
         results = collection_prompts.query(
-            query_texts=[prompt],
+            query_embeddings=[embedding],
             n_results=50,
-            include=["documents", "distances", "metadatas"]
+            include=["distances"]
         )
         
-        similar_ids = [int(id) for id in results['ids'][0] if int(id) != art_id] # Exclude the source art itself
-        
-        if not similar_ids:
-            return []
-
-        # Query similar arts with like status
-        if viewer_id is not None:
-            arts_query = db.query(
-                models.Art,
-                exists().where(
-                    and_(
-                        models.Like.art_id == models.Art.id,
-                        models.Like.user_id == viewer_id
-                    )
-                ).label('liked_by_user')
-            ).filter(models.Art.id.in_(similar_ids)).filter(models.Art.is_public == True)
-        else:
-            arts_query = db.query(
-                models.Art,
-                literal(False).label('liked_by_user')
-            ).filter(models.Art.id.in_(similar_ids)).filter(models.Art.is_public == True)
-            
-        # Preserve ChromaDB order if needed (requires adjusting the query)
-        # For simplicity, current implementation doesn't preserve ChromaDB order
-        # If order preservation is crucial, we'd need a CASE statement like in search_arts
-        arts_result = arts_query.all() 
-        
-        return [
-            {**art.__dict__, "liked_by_user": liked_by_user}
-            for art, liked_by_user in arts_result
-        ]
+        # Closest first, as Chroma ranked them, without the source art itself
+        similar_ids = vector_ranking(results['ids'][0], results['distances'][0], exclude=art_id)
+        return _fetch_arts_in_order(db, similar_ids)
       
     except Exception as e:
         print(f"ChromaDB query or subsequent database query failed: {str(e)}")
-        # Fallback to random arts with like status
-        if viewer_id is not None:
-            arts_query = db.query(
-                models.Art,
-                exists().where(
-                    and_(
-                        models.Like.art_id == models.Art.id,
-                        models.Like.user_id == viewer_id
-                    )
-                ).label('liked_by_user')
-            ).filter(models.Art.id != art_id).filter(models.Art.is_public == True).limit(20)
-        else:
-            arts_query = db.query(
-                models.Art,
-                literal(False).label('liked_by_user')
-            ).filter(models.Art.id != art_id).filter(models.Art.is_public == True).limit(20)
-            
-        arts_result = arts_query.all()
-        
-        return [
-            {**art.__dict__, "liked_by_user": liked_by_user}
-            for art, liked_by_user in arts_result
-        ]
+        # Fallback to random arts
+        db.rollback()
+        return _random_public_arts(db, SIMILAR_FALLBACK_COUNT, models.Art.id != art_id)
 
 @router.get("/arts/id/{art_id}", response_model=schemas.Art)
-async def get_art_by_id(art_id: int, db: Session = Depends(get_db)):
+def get_art_by_id(request: Request, art_id: int, db: Session = Depends(get_db)):
     art = db.query(models.Art).filter(models.Art.id == art_id).first()
     if not art:
         raise HTTPException(status_code=404, detail="Art not found")
-    return art
+    item = _art_payload([art])[0]
+    # A hidden art must not be kept by shared caches
+    policy = PUBLIC_DETAIL_CACHE if art.is_public else PRIVATE_CACHE
+    return conditional_json(request, item, weak_etag("art", art.id, art.num_likes, art.judged_at, art.is_public), policy)
 
-@router.post("/arts/like/{art_id}")
-async def like_unlike_art(art_id: int, user_id: Optional[int] = None, db: Session = Depends(get_db)):
-    art = db.query(models.Art).filter(models.Art.id == art_id).first()
-    if not art:
+def _add_likes(db: Session, art_id: int, delta: int) -> Optional[int]:
+    """`num_likes = num_likes + delta` (floored at zero) in one statement; the new count, None if the art is gone.
+
+    The arts row is locked only for this UPDATE until the caller commits, and
+    concurrent likes queue on it instead of overwriting each other's count.
+    """
+    if delta == 0:
+        return db.query(func.coalesce(models.Art.num_likes, 0)).filter(models.Art.id == art_id).scalar()
+    return db.execute(
+        update(models.Art).where(models.Art.id == art_id)
+        .values(num_likes=func.greatest(func.coalesce(models.Art.num_likes, 0) + delta, 0))
+        .returning(models.Art.num_likes)
+    ).scalar()
+
+
+def _delete_like(db: Session, user_id: int, art_id: int) -> bool:
+    return db.execute(
+        delete(models.Like).where(models.Like.user_id == user_id, models.Like.art_id == art_id)
+        .returning(models.Like.art_id)
+    ).first() is not None
+
+
+def _insert_like(db: Session, user_id: int, art_id: int) -> bool:
+    """Insert the like unless it exists; selecting from arts makes a missing art insert nothing instead of failing."""
+    source = select(literal(user_id), models.Art.id).where(models.Art.id == art_id)
+    try:
+        return db.execute(
+            pg_insert(models.Like).from_select(["user_id", "art_id"], source)
+            .on_conflict_do_nothing().returning(models.Like.art_id)
+        ).first() is not None
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="User not found")
+
+
+def _like_response(db: Session, art_id: int, num_likes: Optional[int]) -> dict:
+    if num_likes is None:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Art not found")
+    db.commit()
+    return {"art_id": art_id, "num_likes": num_likes}
 
+
+@router.post("/arts/like/{art_id}")
+def like_unlike_art(art_id: int, user_id: Optional[int] = None, db: Session = Depends(get_db)):
+    """Toggle the user's like; the count changes only when a likes row was really added or removed."""
     if user_id is not None:
-        # Check if the user has already liked the art
-        like = db.query(models.Like).filter(models.Like.user_id == user_id, models.Like.art_id == art_id).first()
-        if like:
-            # Unlike the art
-            db.delete(like)
-            art.num_likes = max(0, art.num_likes - 1)  # Ensure likes do not go below zero
+        if _delete_like(db, user_id, art_id):
+            delta = -1
         else:
-            # Like the art
-            new_like = models.Like(user_id=user_id, art_id=art_id)
-            db.add(new_like)
-            art.num_likes += 1
+            delta = 1 if _insert_like(db, user_id, art_id) else 0
     else:
-        # Increment likes without user_id - Consider if this logic is intended
-        art.num_likes += 1 # Removed redundant check, just increment if no user_id
-
-    db.commit()
-    db.refresh(art)
-    return {"art_id": art_id, "num_likes": art.num_likes}
+        # Anonymous likes only bump the counter
+        delta = 1
+    return _like_response(db, art_id, _add_likes(db, art_id, delta))
 
 @router.post("/arts/unlike/{art_id}")
-async def unlike_art(art_id: int, user_id: Optional[int] = None, db: Session = Depends(get_db)):
-    art = db.query(models.Art).filter(models.Art.id == art_id).first()
-    if not art:
-        raise HTTPException(status_code=404, detail="Art not found")
-
+def unlike_art(art_id: int, user_id: Optional[int] = None, db: Session = Depends(get_db)):
     # Only decrement likes if user_id is provided and the like exists
-    if user_id is not None:
-        # Check if the user has already liked the art
-        like = db.query(models.Like).filter(models.Like.user_id == user_id, models.Like.art_id == art_id).first()
-        if like:
-            # Unlike the art
-            db.delete(like)
-            art.num_likes = max(0, art.num_likes - 1)  # Ensure likes do not go below zero
+    delta = -1 if user_id is not None and _delete_like(db, user_id, art_id) else 0
+    return _like_response(db, art_id, _add_likes(db, art_id, delta))
 
-    db.commit()
-    db.refresh(art)
-    return {"art_id": art_id, "num_likes": art.num_likes}
-
-@router.get("/arts/likes/{user_id}", response_model=List[schemas.Art])
-async def get_user_liked_arts(user_id: int, viewer_id: Optional[int] = None, limit: int = 1000, db: Session = Depends(get_db)):
-    """Get all arts that a user has liked, sorted by art ID"""
-    # Find all like objects for this user
-    liked_art_ids = db.query(models.Like.art_id).filter(models.Like.user_id == user_id).all()
-    
-    # Extract the art_ids from the query results
-    art_ids = [art_id for (art_id,) in liked_art_ids]
-    
-    if not art_ids:
-        return []
-    
-    # Get all the arts that the user liked, ordered by art ID, along with viewer's like status
-    if viewer_id is not None:
-        arts_query = db.query(
-            models.Art,
-            exists().where(
-                and_(
-                    models.Like.art_id == models.Art.id,
-                    models.Like.user_id == viewer_id
-                )
-            ).label('liked_by_user')
-        ).filter(models.Art.id.in_(art_ids)).order_by(models.Art.date.desc()).limit(limit) # Removed redundant outer join
-    else:
-        # If no viewer_id, liked_by_user is always False
-        arts_query = db.query(
-            models.Art,
-             literal(False).label('liked_by_user') # Simpler: If no viewer_id, they haven't liked it
-        ).filter(models.Art.id.in_(art_ids)).order_by(models.Art.date.desc()).limit(limit)
-         
-    arts_result = arts_query.all()
-
-    # Include the "liked_by_user" flag in the response
-    arts_with_likes = [
-        {
-            **art.__dict__,
-            "liked_by_user": liked_by_user
-        }
-        for art, liked_by_user in arts_result
-    ]
-    
-    return arts_with_likes
+@router.get("/arts/likes/{user_id}", response_model=List[schemas.ArtCard])
+def get_user_liked_arts(
+    request: Request,
+    user_id: int,
+    viewer_id: Optional[int] = None,
+    limit: int = GALLERY_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Arts a user has liked, newest first; follow `X-Next-Cursor` for older pages."""
+    q = db.query(*ART_CARD_COLUMNS).join(
+        models.Like, and_(models.Like.art_id == models.Art.id, models.Like.user_id == user_id)
+    )
+    items, headers = _gallery_page(db, q, limit, cursor, viewer_id)
+    return conditional_json(
+        request, items,
+        art_list_etag(items, "liked", user_id, limit, cursor, viewer_id),
+        PUBLIC_FEED_CACHE if viewer_id is None else PRIVATE_CACHE,
+        headers=headers,
+    )
 
-@router.post("/arts/batch/", response_model=List[schemas.Art])
-async def get_batch_arts(
+@router.post("/arts/batch/", response_model=List[schemas.ArtCard])
+def get_batch_arts(
     art_ids: List[int] = Body(..., embed=True),  # Expect a JSON body like { "art_ids": [1,2,3] }
     viewer_id: Optional[int] = Query(None),       # viewer_id passed as a query parameter
     db: Session = Depends(get_db)
 ):
-    """Get full art objects with liked_by_user field for a batch of art IDs"""
+    """Get art cards with liked_by_user field for a batch of art IDs"""
     if not art_ids:
         return []
     
     # Query all arts in one database call
-    arts = db.query(models.Art).filter(models.Art.id.in_(art_ids)).all()
-    
-    # If viewer_id is provided, get all likes by this user for these arts in one query
-    user_likes = set()
-    if viewer_id is not None:
-        likes = db.query(models.Like).filter(
-            models.Like.user_id == viewer_id,
-            models.Like.art_id.in_(art_ids)
-        ).all()
-        user_likes = {like.art_id for like in likes}
+    arts = art_dicts(db.query(*ART_CARD_COLUMNS).filter(_art_id_in(art_ids)).all())
     
     # Create a dictionary for fast lookup by ID
-    art_dict = {art.id: art for art in arts}
+    art_dict = {art["id"]: art for art in arts}
     
     # Prepare the response in the same order as the input art_ids
-    arts_with_likes = [
-        {
-            **art_dict[art_id].__dict__,
-            "liked_by_user": art_id in user_likes
-        }
-        for art_id in art_ids if art_id in art_dict  # Only include IDs that were found
-    ]
-    
-    return arts_with_likes
+    ordered = [art_dict[art_id] for art_id in art_ids if art_id in art_dict]  # Only include IDs that were found
+    return FastJSONResponse(_overlay_likes(db, ordered, viewer_id))
 
 @router.get("/generate/models")
-async def list_generation_models():
+async def list_generation_models(request: Request):
     """Public list of available generation models for the frontend lineup."""
-    return [
+    lineup = [
         {"id": mid, "label": meta["label"], "tier": meta["tier"], "backend": meta["backend"]}
         for mid, meta in GENERATION_MODELS.items()
     ]
+    return conditional_json(request, lineup, weak_etag("models", lineup), PUBLIC_STATIC_CACHE)
 
 
 @router.post("/generate/image/", response_model=List[schemas.Art])
-async def generate_image_from_prompt(
+def generate_image_from_prompt(
     request: Request,
     prompt: str,
     model: str = Query("flux-schnell"),
@@ -949,7 +1172,7 @@ async def generate_image_from_prompt(
         prompt_hash = hashlib.md5(f"{prompt}:{datetime.utcnow().isoformat()}".encode()).hexdigest()[:16]
         unique_filename = f"generated_{prompt_hash}_{i}.png"
         try:
-            image_url = await upload_image_bytes_to_r2(image_bytes, unique_filename, content_type="image/png")
+            image_url = put_image_bytes_to_r2(image_bytes, unique_filename, content_type="image/png")
         except Exception as e:
             logger.error(f"r2 upload failed: {e}")
             continue
@@ -983,58 +1206,31 @@ async def generate_image_from_prompt(
     return created_arts
     
 
-@router.get("/arts/generated/{user_id}", response_model=List[schemas.Art])
-async def get_user_generated_arts(
+@router.get("/arts/generated/{user_id}", response_model=List[schemas.ArtCard])
+def get_user_generated_arts(
+    request: Request,
     user_id: int,
     viewer_id: Optional[int] = None,
-    limit: int = 1000,
+    limit: int = GALLERY_PAGE_SIZE,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """
-    Get all arts that a user has generated (from the arts table), sorted by creation time.
+    Get the arts a user has generated (from the arts table), newest first.
+    Follow `X-Next-Cursor` for older pages.
     """
-    # Query all generated arts for this user
-    arts_query_base = db.query(models.Art).filter(
+    q = db.query(*ART_CARD_COLUMNS).filter(
         models.Art.owner_id == user_id,
         models.Art.is_generated == True
-    ).order_by(models.Art.date.desc()).limit(limit)
-
-    arts = arts_query_base.all()
-    art_ids = [art.id for art in arts]
-
-    if not art_ids:
-        return []
-
-    # Get all the arts that the user generated, along with viewer's like status
-    if viewer_id is not None:
-        arts_with_likes_data = db.query(
-            models.Art,
-            exists().where(
-                and_(
-                    models.Like.art_id == models.Art.id,
-                    models.Like.user_id == viewer_id
-                )
-            ).label('liked_by_user')
-        ).filter(models.Art.id.in_(art_ids)).order_by(models.Art.date.desc()).all()
-        
-        arts_with_likes = [
-            {
-                **art.__dict__,
-                "liked_by_user": liked_by_user
-            }
-            for art, liked_by_user in arts_with_likes_data
-        ]
-    else:
-        # Query arts without liked_by_user information
-        arts_with_likes = [
-            {
-                **art.__dict__,
-                "liked_by_user": False
-            }
-            for art in arts
-        ]
-
-    return arts_with_likes
+    )
+    items, headers = _gallery_page(db, q, limit, cursor, viewer_id)
+    # Includes the owner's private generations, so never in a shared cache
+    return conditional_json(
+        request, items,
+        art_list_etag(items, "generated", user_id, limit, cursor, viewer_id),
+        PRIVATE_CACHE,
+        headers=headers,
+    )
 
 @router.post("/set-public/{art_id}")
 def set_art_public(
@@ -1055,5 +1251,16 @@ def set_art_public(
     # Update the public status
     art.is_public = is_public
     db.commit()
+    # Visibility changes tier membership, so every worker's feed snapshot and
+    # cached pages are stale
+    bump_feed_version(db)
+    response_cache.invalidate()
+    try:
+        sync_prompt_metadata([art])
+        images = image_collection(create=False)
+        if images is not None:
+            sync_prompt_metadata([art], collection=images)
+    except Exception as e:
+        print(f"ChromaDB metadata sync failed for art {art_id}: {e}")
     
     return {"success": True, "message": f"Art public status set to {is_public}", "art_id": art_id}
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Body, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from .. import models
 import httpx
@@ -21,7 +22,7 @@ def create_access_token(data: dict):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 @router.post("/token")
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     user = db.query(models.User).filter(models.User.email == form_data.username).first()
     print(user)
     user_created = False
@@ -50,6 +51,13 @@ async def google_authenticate(access_token: str = Body(..., embed=True), db: Ses
     if response.status_code != 200:
         raise HTTPException(status_code=response.status_code, detail="Google auth failed")
     google_user_info = response.json()
+    # The Session is synchronous; keep its round-trips off the event loop
+    user = await run_in_threadpool(_upsert_google_user, db, google_user_info)
+    
+    access_token = create_access_token(data={"sub": str(user.id)})
+    return {"access_token": access_token, "token_type": "bearer"}
+
+def _upsert_google_user(db: Session, google_user_info: dict) -> models.User:
     user = db.query(models.User).filter(models.User.email == google_user_info["email"]).first()
     if not user:
         user = models.User(
@@ -62,12 +70,10 @@ async def google_authenticate(access_token: str = Body(..., embed=True), db: Ses
         user.picture = google_user_info["picture"]
     db.commit()
     db.refresh(user)
-    
-    access_token = create_access_token(data={"sub": str(user.id)})
-    return {"access_token": access_token, "token_type": "bearer"}
+    return user
     
 @router.get("/users/me")
-async def read_users_me(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def read_users_me(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: int = payload.get("sub")
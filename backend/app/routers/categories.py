@@ -1,14 +1,15 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List
 from .. import models, schemas
 from ..utils import *
+from ..http_cache import PUBLIC_STATIC_CACHE, weak_etag, conditional_json
 
 router = APIRouter()
 
 @router.get("/categories/top/", response_model=List[schemas.CategoryCount])
-async def read_top_categories(db: Session = Depends(get_db)):
+def read_top_categories(request: Request, db: Session = Depends(get_db)):
     categories_counts = (
         db.query(
             models.Category.name, 
@@ -24,5 +25,5 @@ async def read_top_categories(db: Session = Depends(get_db)):
     categories = [category_count[0] for category_count in categories_counts]
     counts = [category_count[1] for category_count in categories_counts]
 
-    response = [schemas.CategoryCount(name=category, count=count) for category, count in zip(categories, counts)]
-    return response
\ No newline at end of file
+    response = [schemas.CategoryCount(name=category, count=count).model_dump() for category, count in zip(categories, counts)]
+    return conditional_json(request, response, weak_etag("categories", response), PUBLIC_STATIC_CACHE)
\ No newline at end of file
@@ -23,6 +23,7 @@ import os, json, hmac, hashlib, logging
 from datetime import datetime, timedelta
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Request, Header
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from .. import models
@@ -114,16 +115,19 @@ def get_balance(user_id: int, db: Session = Depends(get_db)):
     }
 
 
-def _grant_credits(db: Session, user_id: int, amount: int, reason: str, external_ref: Optional[str], pro_days: int = 0):
+def _grant_credits(db: Session, user_id: int, amount: int, reason: str, external_ref: Optional[str], pro_days: int = 0) -> int:
+    """Credit the user and return the ledger entry id (read here, so async callers never lazy-load it)."""
     if external_ref:
-        existing = db.query(models.CreditLedger).filter(models.CreditLedger.external_ref == external_ref).first()
-        if existing:
+        existing_id = db.query(models.CreditLedger.id).filter(models.CreditLedger.external_ref == external_ref).scalar()
+        if existing_id is not None:
             logger.info(f"Idempotent skip: external_ref={external_ref} already credited")
-            return existing
+            return existing_id
     row = _get_or_create_credits(db, user_id)
     row.balance = (row.balance or 0) + amount
     entry = models.CreditLedger(user_id=user_id, delta=amount, reason=reason, external_ref=external_ref)
     db.add(entry)
+    db.flush()  # assigns entry.id before commit expires it
+    ledger_id = entry.id
     if pro_days > 0:
         user = db.query(models.User).filter(models.User.id == user_id).first()
         if user:
@@ -133,7 +137,7 @@ def _grant_credits(db: Session, user_id: int, amount: int, reason: str, external
             user.is_pro = True
             logger.info(f"granted {pro_days}d pro to user {user_id}, pro_until={user.pro_until.isoformat()}")
     db.commit()
-    return entry
+    return ledger_id
 
 
 @router.post("/credits/admin/grant")
@@ -141,8 +145,8 @@ def admin_grant(user_id: int, amount: int, reason: str = "admin", token: str = H
     expected = os.getenv("ADMIN_TOKEN", "")
     if not expected or token != expected:
         raise HTTPException(status_code=403, detail="forbidden")
-    entry = _grant_credits(db, user_id, amount, reason, external_ref=None)
-    return {"ok": True, "ledger_id": entry.id}
+    ledger_id = _grant_credits(db, user_id, amount, reason, external_ref=None)
+    return {"ok": True, "ledger_id": ledger_id}
 
 
 @router.post("/webhooks/lemon-squeezy")
@@ -188,5 +192,7 @@ async def lemon_squeezy_webhook(request: Request, x_signature: str = Header(None
         return {"ok": True, "ignored": f"unknown variant {variant_id}"}
 
     external_ref = f"ls:{data.get('id') or attrs.get('order_id') or attrs.get('identifier')}"
-    entry = _grant_credits(db, user_id, credits, reason="purchase", external_ref=external_ref, pro_days=pro_days)
-    return {"ok": True, "credited": credits, "pro_days": pro_days, "user_id": user_id, "ledger_id": entry.id}
+    ledger_id = await run_in_threadpool(
+        _grant_credits, db, user_id, credits, reason="purchase", external_ref=external_ref, pro_days=pro_days
+    )
+    return {"ok": True, "credited": credits, "pro_days": pro_days, "user_id": user_id, "ledger_id": ledger_id}
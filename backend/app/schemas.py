@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Union, Dict, Any
 from datetime import datetime
 
@@ -18,8 +18,7 @@ class User(UserCreate):
     premium: bool = False
     role: str = "user"
     
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Art
 class ArtBase(BaseModel):
@@ -48,24 +47,52 @@ class Art(ArtBase):
     premium: bool = False
     liked_by_user: bool = False
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+class ArtCard(BaseModel):
+    """Gallery-grid view of an art; the full record stays on /arts/id/{art_id}."""
+    id: int
+    src: str
+    width: int
+    height: int
+    prompt: str
+    owner_id: int
+    date: Optional[datetime] = None
+    num_likes: int = 0
+    is_generated: bool = False
+    is_public: bool = True
+    premium: bool = False
+    quality_score: Optional[float] = None
+    is_curated: Optional[bool] = False
+    is_premium: Optional[bool] = False
+    liked_by_user: bool = False
+
+    model_config = ConfigDict(from_attributes=True)
+
+class SearchBatchRequest(BaseModel):
+    """Several searches answered together (category chips, related searches)."""
+    queries: List[str] = Field(..., min_length=1, max_length=20)
+    tier: str = "curated"
+    limit: int = 20
+    user_id: Optional[int] = None
+
+class SearchBatchResult(BaseModel):
+    query: str
+    items: List[ArtCard]
 
 # Like
 class LikeBase(BaseModel):
     user_id: int
     art_id: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Follow
 class FollowBase(BaseModel):
     follower_id: int
     followee_id: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # SearchHistory
 class SearchHistoryBase(BaseModel):
@@ -79,8 +106,7 @@ class SearchHistory(SearchHistoryBase):
     id: int
     user_id: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # ArtHistory
 class ArtHistoryBase(BaseModel):
@@ -94,8 +120,7 @@ class ArtHistory(ArtHistoryBase):
     art_id: int
     user_id: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # additional
 class CategoryCount(BaseModel):
@@ -109,8 +134,7 @@ class ArtMetadataSchema(BaseModel):
     comments: str
     upvotes: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ArtMetadataCreate(BaseModel):
     art_id: int
@@ -125,8 +149,7 @@ class ProcessedLinkResponse(BaseModel):
     id: int
     link: str
     
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class Category(BaseModel):
     id: int
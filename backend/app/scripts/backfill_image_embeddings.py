@@ -0,0 +1,121 @@
+"""
+Backfill the CLIP image collection used by POST /arts/search/by-image.
+
+Arts are read in id order, their images downloaded by a small thread pool and
+embedded CLIP_BATCH_SIZE at a time on CPU; each page is upserted with the
+same tier metadata as Prompts, so image search filters by tier the same way.
+The next page downloads while the current one is embedded. --resume skips
+ids already in the collection, so the script can run on a schedule to pick
+up new uploads.
+
+  python -m app.scripts.backfill_image_embeddings
+  nohup python -m app.scripts.backfill_image_embeddings --resume --page-size 256 &
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from app import models
+from app.chroma_services import prompt_metadata
+from app.database import SessionLocal
+from app.services.embedding_service import CLIP_IMAGE_COLLECTION, get_multimodal_service, image_collection
+
+
+def _download(src: str, timeout: float):
+    try:
+        response = requests.get(src, timeout=timeout)
+        response.raise_for_status()
+        return response.content
+    except requests.RequestException:
+        return None
+
+
+def _pages(db, start_id: int, page_size: int, limit: int):
+    columns = [models.Art.id, models.Art.src, models.Art.is_public, models.Art.is_curated,
+               models.Art.is_premium, models.Art.quality_score]
+    last_id, read = start_id, 0
+    while not limit or read < limit:
+        size = min(page_size, limit - read) if limit else page_size
+        rows = db.query(*columns).filter(
+            models.Art.id > last_id, models.Art.src.isnot(None)
+        ).order_by(models.Art.id).limit(size).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        read += len(rows)
+        yield rows
+
+
+def backfill(page_size: int, download_workers: int, timeout: float, start_id: int, limit: int, resume: bool):
+    collection = image_collection()
+    if collection is None:
+        raise SystemExit("ChromaDB is not reachable")
+    service = get_multimodal_service()
+    print(f"{CLIP_IMAGE_COLLECTION}: {collection.count()} images before backfill")
+
+    db = SessionLocal()
+    pool = ThreadPoolExecutor(max_workers=download_workers)
+    prefetch = ThreadPoolExecutor(max_workers=1)  # fetches the next page; waits on `pool`
+    embedded = skipped = failed = 0
+    t0 = time.time()
+    try:
+        def fetch(rows):
+            if resume:
+                present = set(collection.get(ids=[str(row.id) for row in rows], include=[])["ids"])
+                rows = [row for row in rows if str(row.id) not in present]
+            return rows, list(pool.map(lambda row: _download(row.src, timeout), rows))
+
+        pages = _pages(db, start_id, page_size, limit)
+        pending = None
+        for rows in pages:
+            # Downloads for this page overlap with embedding the previous one
+            next_pending = (len(rows), prefetch.submit(fetch, rows))
+            if pending:
+                embedded, skipped, failed = _embed_page(service, collection, *pending, embedded, skipped, failed)
+                print(f"  {embedded} embedded, {skipped} skipped, {failed} failed ({embedded / max(time.time() - t0, 1e-9):.1f} img/s)")
+            pending = next_pending
+        if pending:
+            embedded, skipped, failed = _embed_page(service, collection, *pending, embedded, skipped, failed)
+    finally:
+        prefetch.shutdown(wait=False)
+        pool.shutdown(wait=False)
+        db.close()
+    elapsed = time.time() - t0
+    print(f"done: {embedded} embedded, {skipped} skipped, {failed} failed in {elapsed:.1f}s "
+          f"({embedded / max(elapsed, 1e-9):.1f} img/s); {collection.count()} images in {CLIP_IMAGE_COLLECTION}")
+
+
+def _embed_page(service, collection, read, future, embedded, skipped, failed):
+    rows, blobs = future.result()
+    skipped += read - len(rows)
+    ids, tensors, metadatas = [], [], []
+    for row, blob in zip(rows, blobs):
+        try:
+            tensors.append(service.preprocess(blob))
+        except Exception:
+            failed += 1  # download failed or not an image
+            continue
+        ids.append(str(row.id))
+        metadatas.append(prompt_metadata(row))
+    if ids:
+        collection.upsert(ids=ids, embeddings=service.embed_tensors(tensors), metadatas=metadatas)
+        embedded += len(ids)
+    return embedded, skipped, failed
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--page-size", type=int, default=128)
+    p.add_argument("--download-workers", type=int, default=16)
+    p.add_argument("--timeout", type=float, default=20.0, help="per-image download timeout (s)")
+    p.add_argument("--start-id", type=int, default=0)
+    p.add_argument("--limit", type=int, default=0, help="arts to read (0 = all)")
+    p.add_argument("--resume", action="store_true", help="skip ids already in the collection")
+    args = p.parse_args()
+    backfill(args.page_size, args.download_workers, args.timeout, args.start_id, args.limit, args.resume)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark: per-item cost of serializing Art list responses.
+
+Compares the old response path (ORM entity -> `{**art.__dict__}` -> FastAPI
+re-validation against List[schemas.Art] -> stdlib JSON) with the fast path
+(ArtCard column-projected row -> plain dict -> orjson bytes).
+
+Synthetic mode needs no database and isolates serialization cost:
+  python -m app.scripts.bench_art_serialization --items 200 1000
+
+With --from-db the same comparison also includes loading N real public arts
+(full ORM entities vs projected card columns) through DATABASE_URL:
+  python -m app.scripts.bench_art_serialization --from-db --items 200 1000
+"""
+import argparse
+import json
+import os
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import List
+
+# Models build an engine at import time; it never connects in synthetic mode
+os.environ.setdefault("DATABASE_URL", "postgresql+psycopg2://localhost/bench")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+
+from pydantic import TypeAdapter
+
+from app import models, schemas
+from app.serialization import ART_CARD_COLUMNS, art_dicts, dumps
+
+ART_LIST = TypeAdapter(List[schemas.Art])
+
+
+def synthetic_arts(n: int):
+    base = datetime(2025, 1, 1)
+    return [
+        models.Art(
+            id=i, src=f"https://images.aiartbase.com/{i:08d}.webp", width=832, height=1216,
+            prompt="cinematic portrait of a cyberpunk samurai, neon rain, volumetric light " * 2,
+            descriptive_prompt="A detailed description of the image used for semantic search. " * 4,
+            owner_id=4, num_likes=i % 17, is_generated=False, is_public=True, premium=False,
+            aesthetic_score=6.5, ai_obvious_score=3.0, quality_score=72.5, is_curated=True,
+            is_premium=i % 20 == 0, judge_notes="comp=7 craft=8 integrity=7 wow=6 ai=3 | crisp and deliberate",
+            judged_at=base, date=base + timedelta(minutes=i),
+        )
+        for i in range(n)
+    ]
+
+
+def project(arts) -> list:
+    """Stand-in for projected SQLAlchemy Rows: named tuples over the same columns."""
+    Row = namedtuple("Row", [column.key for column in ART_CARD_COLUMNS])
+    return [Row(*(getattr(art, name) for name in Row._fields)) for art in arts]
+
+
+def old_path(arts) -> bytes:
+    items = [{**art.__dict__, "liked_by_user": False} for art in arts]
+    validated = ART_LIST.validate_python(items)
+    return json.dumps(ART_LIST.dump_python(validated, mode="json")).encode()
+
+
+def new_path(rows) -> bytes:
+    return dumps(art_dicts(rows))
+
+
+def timeit(fn, arg, repeat: int) -> float:
+    fn(arg)  # warm-up
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def load_from_db(n: int):
+    from app.database import SessionLocal
+    db = SessionLocal()
+    try:
+        db.query(models.Art.id).limit(1).all()  # open the connection outside the timings
+        t0 = time.perf_counter()
+        arts = db.query(models.Art).filter(models.Art.is_public == True).order_by(models.Art.id.desc()).limit(n).all()
+        orm_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        rows = db.query(*ART_CARD_COLUMNS).filter(models.Art.is_public == True).order_by(models.Art.id.desc()).limit(n).all()
+        projected_s = time.perf_counter() - t0
+        return arts, rows, orm_s, projected_s
+    finally:
+        db.close()
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--items", type=int, nargs="+", default=[200, 1000])
+    p.add_argument("--repeat", type=int, default=20)
+    p.add_argument("--from-db", action="store_true")
+    args = p.parse_args()
+
+    print(f"{'items':>6} {'old us/item':>12} {'new us/item':>12} {'speedup':>8} {'old KB':>8} {'new KB':>8}")
+    for n in args.items:
+        if args.from_db:
+            arts, rows, orm_s, projected_s = load_from_db(n)
+            print(f"  load {len(arts)} arts: ORM {orm_s * 1000:.1f}ms, projected {projected_s * 1000:.1f}ms")
+        else:
+            arts = synthetic_arts(n)
+            rows = project(arts)
+        count = max(1, len(arts))
+        old_s = timeit(old_path, arts, args.repeat)
+        new_s = timeit(new_path, rows, args.repeat)
+        print(
+            f"{len(arts):>6} {old_s / count * 1e6:>12.2f} {new_s / count * 1e6:>12.2f} {old_s / max(new_s, 1e-9):>7.1f}x"
+            f" {len(old_path(arts)) / 1024:>8.1f} {len(new_path(rows)) / 1024:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
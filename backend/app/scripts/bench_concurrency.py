@@ -0,0 +1,103 @@
+"""
+Benchmark: requests/second one worker sustains as concurrency grows.
+
+Routes that call the synchronous SQLAlchemy Session must run as `def` (or push
+their DB work through run_in_threadpool); an `async def` route that queries
+directly stalls the event loop, so throughput stays flat no matter how many
+requests are in flight.
+
+Against a running single worker:
+  uvicorn app.main:app --workers 1 --port 8000
+  python -m app.scripts.bench_concurrency --url http://localhost:8000
+
+In-process (ASGI transport, DATABASE_URL must point at a seeded database).
+--db-latency-ms adds a blocking sleep to every statement, standing in for the
+network round trip to a remote Postgres that local runs don't have:
+  python -m app.scripts.bench_concurrency --db-latency-ms 5 --concurrency 1 8 32
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/arts/?tier=all&limit=50",
+    "/arts/1?limit=60",
+    "/arts/likes/1?limit=60",
+    "/arts/id/1",
+    "/categories/top/",
+]
+
+
+def _add_db_latency(seconds: float) -> None:
+    from sqlalchemy import event
+    from app.database import engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _sleep(*_args):
+        time.sleep(seconds)
+
+
+def _client(url: str) -> httpx.AsyncClient:
+    if url:
+        return httpx.AsyncClient(base_url=url, timeout=60)
+    from app.main import app
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+
+async def run_level(client: httpx.AsyncClient, paths, concurrency: int, total: int) -> dict:
+    latencies, errors = [], 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            path = paths[i % len(paths)]
+            t0 = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+async def main_async(args):
+    async with _client(args.url) as client:
+        await run_level(client, args.path, 1, len(args.path))  # warm-up: connections, snapshots, caches
+        print(f"{'conc':>5} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+        for concurrency in args.concurrency:
+            r = await run_level(client, args.path, concurrency, max(args.requests, concurrency))
+            print(f"{concurrency:>5} {r['rps']:>9.1f} {r['p50']:>8.1f} {r['p95']:>8.1f} {r['errors']:>7}")
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--url", default="", help="base url of a running worker; in-process when omitted")
+    p.add_argument("--path", action="append", help="request path (repeatable); defaults to the hot read routes")
+    p.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 32])
+    p.add_argument("--requests", type=int, default=400, help="requests per concurrency level")
+    p.add_argument("--db-latency-ms", type=float, default=0.0, help="in-process only: simulated DB round trip")
+    args = p.parse_args()
+    args.path = args.path or DEFAULT_PATHS
+    if args.db_latency_ms and not args.url:
+        _add_db_latency(args.db_latency_ms / 1000)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
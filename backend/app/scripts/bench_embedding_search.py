@@ -0,0 +1,87 @@
+"""
+Benchmark: search latency per embedding backend (embed the query + Chroma query).
+
+Each query is embedded directly with the backend, bypassing the query-embedding
+cache, so the numbers are for a cold query. When the backend's Prompts
+collection exists (see reembed_collections) the Chroma query is timed too.
+
+  python -m app.scripts.bench_embedding_search --backends openai onnx
+  python -m app.scripts.bench_embedding_search --backends onnx --queries-file queries.txt --rounds 5
+"""
+import argparse
+import time
+
+from app.chroma_services import chroma
+from app.embeddings import EMBEDDING_BACKENDS, collection_name, get_embedding_function
+
+DEFAULT_QUERIES = [
+    "anime girl", "cyberpunk city", "cyberpunk city at night with neon rain", "dragon", "fantasy castle",
+    "portrait of an old sailor", "space station orbiting a gas giant", "cute robot", "underwater ruins",
+    "steampunk airship", "sunset over the ocean", "forest spirit", "post apocalyptic highway",
+    "samurai in the snow", "watercolor fox", "alien jungle", "futuristic car", "surreal melting clock",
+]
+
+
+def percentile(values, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def bench_backend(backend: str, model: str, queries, rounds: int, n_results: int):
+    function = get_embedding_function(backend, model)
+    t0 = time.perf_counter()
+    function(["warm-up"])  # model load / connection setup is a one-off per process
+    load_ms = (time.perf_counter() - t0) * 1000
+
+    collection = None
+    if chroma.client is not None:
+        try:
+            collection = chroma.client.get_collection(name=collection_name("Prompts", backend, model))
+            if collection.count() == 0:
+                collection = None
+        except Exception:
+            collection = None
+
+    embed_ms, total_ms = [], []
+    for _ in range(rounds):
+        for query in queries:
+            t0 = time.perf_counter()
+            embedding = function([query])[0]
+            t1 = time.perf_counter()
+            if collection is not None:
+                collection.query(query_embeddings=[embedding], n_results=n_results, include=["distances"])
+            t2 = time.perf_counter()
+            embed_ms.append((t1 - t0) * 1000)
+            total_ms.append((t2 - t0) * 1000)
+
+    print(
+        f"{backend + ':' + function.model:<40} {load_ms:>8.0f} {percentile(embed_ms, .5):>8.1f} {percentile(embed_ms, .99):>8.1f}"
+        + (f" {percentile(total_ms, .5):>9.1f} {percentile(total_ms, .99):>9.1f}" if collection is not None else "         -         -")
+    )
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--backends", nargs="+", default=["openai", "onnx"], choices=EMBEDDING_BACKENDS)
+    p.add_argument("--model", action="append", default=[], help="backend=model override, e.g. sentence-transformers=all-mpnet-base-v2")
+    p.add_argument("--queries-file", help="one query per line")
+    p.add_argument("--rounds", type=int, default=3)
+    p.add_argument("--n-results", type=int, default=100)
+    args = p.parse_args()
+
+    queries = DEFAULT_QUERIES
+    if args.queries_file:
+        with open(args.queries_file) as f:
+            queries = [line.strip() for line in f if line.strip()]
+    models = dict(item.split("=", 1) for item in args.model)
+
+    print(f"{'backend:model':<40} {'load ms':>8} {'emb p50':>8} {'emb p99':>8} {'srch p50':>9} {'srch p99':>9}")
+    for backend in args.backends:
+        try:
+            bench_backend(backend, models.get(backend, ""), queries, args.rounds, args.n_results)
+        except Exception as e:
+            print(f"{backend:<40} failed: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: CLIP image-embedding throughput on CPU, per batch size.
+
+Measures what bounds the image backfill: decode + preprocess (per image, on
+the calling thread) and the forward pass (one per batch). Images are
+synthetic JPEGs by default; --from-db N downloads N real art images instead.
+
+  python -m app.scripts.bench_image_embedding
+  python -m app.scripts.bench_image_embedding --batch-sizes 1 16 64 --images 256
+  CLIP_THREADS=4 python -m app.scripts.bench_image_embedding --from-db 128
+"""
+import argparse
+import io
+import time
+
+import numpy as np
+from PIL import Image
+
+from app.services.embedding_service import CLIP_CHECKPOINT, CLIP_MODEL, get_multimodal_service
+
+
+def synthetic_images(count: int, size: int):
+    rng = np.random.default_rng(0)
+    images = []
+    for _ in range(count):
+        buffer = io.BytesIO()
+        Image.fromarray(rng.integers(0, 255, (size, size, 3), dtype=np.uint8)).save(buffer, format="JPEG", quality=90)
+        images.append(buffer.getvalue())
+    return images
+
+
+def db_images(count: int):
+    import requests
+    from app import models
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        srcs = [src for (src,) in db.query(models.Art.src).filter(models.Art.src.isnot(None)).limit(count)]
+    finally:
+        db.close()
+    images = []
+    for src in srcs:
+        try:
+            images.append(requests.get(src, timeout=20).content)
+        except requests.RequestException:
+            pass
+    return images
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--images", type=int, default=128)
+    p.add_argument("--size", type=int, default=1024, help="synthetic image side in px")
+    p.add_argument("--from-db", type=int, default=0, help="download this many art images instead")
+    p.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    args = p.parse_args()
+
+    images = db_images(args.from_db) if args.from_db else synthetic_images(args.images, args.size)
+    t0 = time.perf_counter()
+    service = get_multimodal_service()
+    print(f"{CLIP_MODEL}/{CLIP_CHECKPOINT}: model load {time.perf_counter() - t0:.1f}s, {len(images)} images")
+
+    t0 = time.perf_counter()
+    tensors = [service.preprocess(image) for image in images]
+    preprocess_s = time.perf_counter() - t0
+    print(f"decode + preprocess: {len(tensors) / preprocess_s:.1f} img/s")
+    service.embed_tensors(tensors[:1])  # warm-up
+
+    print(f"{'batch':>6} {'fwd img/s':>10} {'ms/batch':>9} {'end-to-end img/s':>17}")
+    for batch_size in args.batch_sizes:
+        t0 = time.perf_counter()
+        service.embed_tensors(tensors, batch_size)
+        forward_s = time.perf_counter() - t0
+        batches = -(-len(tensors) // batch_size)
+        print(
+            f"{batch_size:>6} {len(tensors) / forward_s:>10.1f} {forward_s / batches * 1000:>9.1f} "
+            f"{len(tensors) / (forward_s + preprocess_s):>17.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
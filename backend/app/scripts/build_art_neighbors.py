@@ -0,0 +1,201 @@
+"""
+Precompute the "more like this" list of every art into the art_neighbors table.
+
+GET /arts/similar/{art_id} serves these rows with one primary-key lookup and
+only falls back to a live vector query for arts that have no row yet.
+
+Two modes:
+  --full        exact top-K for every vector in Prompts: the collection is
+                loaded into one L2-normalized float32 matrix (N x dim x 4
+                bytes) and scored --block rows at a time with a NumPy matmul.
+                Run it after deploying and after switching embedding models
+                (see reembed_collections), since old lists belong to the old
+                vectors.
+  (default)     incremental: only arts with no row yet. Their stored vectors
+                are sent to Chroma as batched multi-vector queries, and each
+                new art is merged into the lists of the neighbours it found
+                when it is closer than their current last entry. Cheap enough
+                to run on a schedule to pick up new uploads.
+
+Lists include private arts; visibility is checked when they are served.
+
+  python -m app.scripts.build_art_neighbors --full
+  python -m app.scripts.build_art_neighbors --k 50 --batch-size 256
+"""
+import argparse
+import time
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app import models
+from app.chroma_services import collection_prompts
+from app.database import SessionLocal
+
+
+def _write(db, rows) -> None:
+    """Upsert [(art_id, neighbor_ids, distances)] in one statement."""
+    if not rows:
+        return
+    now = datetime.utcnow()
+    stmt = pg_insert(models.ArtNeighbor.__table__).values([
+        {"art_id": art_id, "neighbor_ids": ids, "distances": distances, "computed_at": now}
+        for art_id, ids, distances in rows
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.ArtNeighbor.art_id],
+        set_={"neighbor_ids": stmt.excluded.neighbor_ids, "distances": stmt.excluded.distances,
+              "computed_at": stmt.excluded.computed_at},
+    )
+    db.execute(stmt)
+    db.commit()
+
+
+def _existing_art_ids(db, ids) -> set:
+    # Chroma can hold ids of deleted arts; art_neighbors.art_id references arts
+    return {art_id for (art_id,) in db.query(models.Art.id).filter(models.Art.id.in_(ids))}
+
+
+# Full rebuild
+
+def load_matrix(collection, page_size: int):
+    """All Prompts vectors as (int64 ids, L2-normalized float32 matrix)."""
+    ids, chunks, offset = [], [], 0
+    while True:
+        page = collection.get(include=["embeddings"], limit=page_size, offset=offset)
+        if not page["ids"]:
+            break
+        offset += len(page["ids"])
+        keep = [i for i, id_ in enumerate(page["ids"]) if id_.isdigit()]
+        ids.extend(int(page["ids"][i]) for i in keep)
+        chunks.append(np.asarray(page["embeddings"], dtype=np.float32)[keep])
+        print(f"  loaded {offset} vectors")
+    if not ids:
+        return np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=np.float32)
+    matrix = np.vstack(chunks)
+    matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    return np.asarray(ids, dtype=np.int64), matrix
+
+
+def top_k(block, matrix, k: int, self_rows):
+    """Row indices of the k most similar rows of `matrix` per row of `block`, closest first, and their cosine distances."""
+    sims = block @ matrix.T
+    sims[np.arange(len(block)), self_rows] = -np.inf  # never your own neighbour
+    k = min(k, matrix.shape[0] - 1)
+    part = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    part_sims = np.take_along_axis(sims, part, axis=1)
+    order = np.argsort(-part_sims, axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1), 1.0 - np.take_along_axis(part_sims, order, axis=1)
+
+
+def build_full(db, collection, k: int, block_size: int, page_size: int) -> int:
+    ids, matrix = load_matrix(collection, page_size)
+    if len(ids) < 2:
+        return 0
+    print(f"  {len(ids)} x {matrix.shape[1]} matrix ({matrix.nbytes / 2**20:.0f} MiB)")
+    written = 0
+    t0 = time.time()
+    for start in range(0, len(ids), block_size):
+        rows = np.arange(start, min(start + block_size, len(ids)))
+        neighbors, distances = top_k(matrix[rows], matrix, k, rows)
+        present = _existing_art_ids(db, ids[rows].tolist())
+        _write(db, [
+            (int(ids[row]), ids[neighbors[i]].tolist(), distances[i].tolist())
+            for i, row in enumerate(rows) if int(ids[row]) in present
+        ])
+        written += len(present)
+        print(f"  {written} written ({written / max(time.time() - t0, 1e-9):.0f} arts/s)")
+    return written
+
+
+# Incremental
+
+def _missing_ids(db, last_id: int, page_size: int):
+    """Next page of art ids above `last_id` without an art_neighbors row."""
+    return [art_id for (art_id,) in db.query(models.Art.id).outerjoin(
+        models.ArtNeighbor, models.ArtNeighbor.art_id == models.Art.id
+    ).filter(
+        models.Art.id > last_id, models.ArtNeighbor.art_id.is_(None)
+    ).order_by(models.Art.id).limit(page_size)]
+
+
+def _merge_reverse(db, candidates, k: int) -> int:
+    """Fold {existing art id: [(new id, distance)]} into the stored lists; returns lists changed."""
+    rows = db.query(models.ArtNeighbor).filter(models.ArtNeighbor.art_id.in_(list(candidates))).all()
+    updates = []
+    for row in rows:
+        worst = row.distances[-1] if len(row.distances) >= k else float("inf")
+        closer = [(n, d) for n, d in candidates[row.art_id] if d < worst and n not in row.neighbor_ids]
+        if not closer:
+            continue
+        merged = sorted(list(zip(row.neighbor_ids, row.distances)) + closer, key=lambda item: item[1])[:k]
+        updates.append((row.art_id, [n for n, _ in merged], [d for _, d in merged]))
+    db.rollback()  # the rows were only read; _write commits the upsert
+    _write(db, updates)
+    return len(updates)
+
+
+def build_incremental(db, collection, k: int, batch_size: int) -> int:
+    written = merged = 0
+    last_id = 0
+    t0 = time.time()
+    while True:
+        art_ids = _missing_ids(db, last_id, batch_size)
+        if not art_ids:
+            break
+        last_id = art_ids[-1]
+        stored = collection.get(ids=[str(art_id) for art_id in art_ids], include=["embeddings"])
+        if not stored["ids"]:
+            continue  # not in Prompts (e.g. generated arts)
+        results = collection.query(
+            query_embeddings=[list(map(float, e)) for e in stored["embeddings"]],
+            n_results=k + 1,
+            include=["distances"],
+        )
+        new_rows = []
+        reverse = {}
+        for id_, hits, distances in zip(stored["ids"], results["ids"], results["distances"]):
+            art_id = int(id_)
+            pairs = [(int(h), float(d)) for h, d in zip(hits, distances) if h != id_ and h.isdigit()][:k]
+            new_rows.append((art_id, [n for n, _ in pairs], [d for _, d in pairs]))
+            for neighbor_id, distance in pairs:
+                reverse.setdefault(neighbor_id, []).append((art_id, distance))
+        _write(db, new_rows)
+        written += len(new_rows)
+        # Arts of this batch already saw each other in the query above
+        for art_id, _, _ in new_rows:
+            reverse.pop(art_id, None)
+        if reverse:
+            merged += _merge_reverse(db, reverse, k)
+        print(f"  up to id {last_id}: {written} new lists, {merged} existing lists updated "
+              f"({written / max(time.time() - t0, 1e-9):.0f} arts/s)")
+    return written
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--k", type=int, default=50, help="neighbours kept per art")
+    p.add_argument("--full", action="store_true", help="recompute every list with NumPy instead of only missing ones")
+    p.add_argument("--block", type=int, default=512, help="--full: matrix rows scored per matmul")
+    p.add_argument("--page-size", type=int, default=5000, help="--full: vectors read from Chroma per page")
+    p.add_argument("--batch-size", type=int, default=256, help="incremental: vectors per Chroma query")
+    args = p.parse_args()
+
+    if collection_prompts is None:
+        raise SystemExit("Prompts collection is not available")
+
+    db = SessionLocal()
+    t0 = time.time()
+    try:
+        if args.full:
+            written = build_full(db, collection_prompts, args.k, args.block, args.page_size)
+        else:
+            written = build_incremental(db, collection_prompts, args.k, args.batch_size)
+    finally:
+        db.close()
+    print(f"done: {written} neighbour lists written in {time.time() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
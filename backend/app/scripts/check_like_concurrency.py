@@ -0,0 +1,94 @@
+"""
+Concurrency check: parallel likes on one art must not lose counter updates.
+
+Fires --users concurrent POST /arts/like/{art_id} (one per user who has not
+liked the art yet), then the same users again, so every like is toggled off.
+After each round arts.num_likes must have moved by exactly the change in
+likes rows for the art; a read-modify-write counter loses updates as soon as
+two requests overlap. The second round leaves the art and its likes as found.
+Exits 1 on a mismatch.
+
+Run against a dev database (DATABASE_URL), in-process or against a worker:
+  python -m app.scripts.check_like_concurrency --art-id 1 --users 50
+  python -m app.scripts.check_like_concurrency --art-id 1 --url http://localhost:8000 --rounds 3
+"""
+import argparse
+import asyncio
+import sys
+
+import httpx
+
+from app import models
+from app.database import SessionLocal
+
+
+def _client(url: str) -> httpx.AsyncClient:
+    if url:
+        return httpx.AsyncClient(base_url=url, timeout=60)
+    from app.main import app
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://check", timeout=60)
+
+
+def _state(art_id: int):
+    """(num_likes, likes rows) of the art, read in a fresh session."""
+    db = SessionLocal()
+    try:
+        num_likes = db.query(models.Art.num_likes).filter(models.Art.id == art_id).scalar()
+        rows = db.query(models.Like).filter(models.Like.art_id == art_id).count()
+        return num_likes or 0, rows
+    finally:
+        db.close()
+
+
+def _users_without_like(art_id: int, count: int):
+    db = SessionLocal()
+    try:
+        liked = db.query(models.Like.user_id).filter(models.Like.art_id == art_id)
+        return [user_id for (user_id,) in db.query(models.User.id).filter(
+            models.User.id.notin_(liked)
+        ).order_by(models.User.id).limit(count)]
+    finally:
+        db.close()
+
+
+async def _toggle_all(client: httpx.AsyncClient, art_id: int, user_ids):
+    # Every request is in flight before the first response can arrive
+    responses = await asyncio.gather(*(
+        client.post(f"/arts/like/{art_id}", params={"user_id": user_id}) for user_id in user_ids
+    ))
+    return sum(response.status_code >= 400 for response in responses)
+
+
+async def main_async(args) -> bool:
+    user_ids = _users_without_like(args.art_id, args.users)
+    if not user_ids:
+        raise SystemExit("no users without a like on this art")
+    ok = True
+    async with _client(args.url) as client:
+        for round_ in range(1, args.rounds + 1):
+            for step, expected in (("like", len(user_ids)), ("unlike", -len(user_ids))):
+                before_likes, before_rows = _state(args.art_id)
+                errors = await _toggle_all(client, args.art_id, user_ids)
+                after_likes, after_rows = _state(args.art_id)
+                counted, stored = after_likes - before_likes, after_rows - before_rows
+                passed = counted == stored == expected and not errors
+                ok &= passed
+                print(f"round {round_} {step:>6}: {len(user_ids)} concurrent requests, {errors} errors; "
+                      f"num_likes {before_likes} -> {after_likes} ({counted:+d}), "
+                      f"likes rows {before_rows} -> {after_rows} ({stored:+d}) "
+                      f"{'ok' if passed else 'LOST UPDATES'}")
+    return ok
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--art-id", type=int, required=True)
+    p.add_argument("--users", type=int, default=50, help="concurrent likers (existing users without a like on the art)")
+    p.add_argument("--rounds", type=int, default=1)
+    p.add_argument("--url", default="", help="base url of a running worker; in-process when omitted")
+    args = p.parse_args()
+    sys.exit(0 if asyncio.run(main_async(args)) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+End-to-end check of GET /arts/search/suggest: the index is started by the app
+and answers with completions that exist in the database.
+
+Picks a term the index has to hold (a category name, else a searched query,
+else the most frequent prompt n-gram), waits for the first build to show up
+in /cache-stats, then asks the route for the term itself and for its first
+three characters. Both answers must be non-empty and the full term must come
+back. Exits 1 otherwise.
+
+In-process, the app runs its startup hooks exactly as a worker does; --url
+checks a running worker instead:
+  python -m app.scripts.check_suggest
+  python -m app.scripts.check_suggest --url http://localhost:8000 --wait 300
+"""
+import argparse
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+from app import models
+from app.database import SessionLocal
+from app.suggest import MAX_SUGGEST_LIMIT, SUGGEST_MIN_COUNT, normalize_term, prompt_ngrams
+
+
+def _expected_term(sample: int) -> str:
+    """A term every build of the index contains, read straight from the database."""
+    db = SessionLocal()
+    try:
+        for (name,) in db.query(models.Category.name).order_by(models.Category.id).limit(50):
+            if len(normalize_term(name or "")) >= 3:
+                return normalize_term(name)
+        for (query,) in db.query(models.SearchHistory.query).order_by(models.SearchHistory.id.desc()).limit(50):
+            if len(normalize_term(query or "")) >= 3:
+                return normalize_term(query)
+        counts = Counter()
+        for (prompt,) in db.query(models.Art.prompt).filter(models.Art.is_public == True).limit(sample):
+            counts.update(prompt_ngrams(prompt or ""))
+        common = [gram for gram, n in counts.most_common() if n >= SUGGEST_MIN_COUNT]
+        return common[0] if common else ""
+    finally:
+        db.close()
+
+
+def _wait_for_build(client, wait: float) -> bool:
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        if client.get("/cache-stats").json()["suggestions"]["built_at"] is not None:
+            return True
+        time.sleep(0.5)
+    return False
+
+
+def run(client, term: str, wait: float) -> bool:
+    if not _wait_for_build(client, wait):
+        print(f"suggestion index not built after {wait:.0f}s (is SUGGEST_ENABLED off?)")
+        return False
+    ok = True
+    for prefix in (term[:3], term):
+        response = client.get("/arts/search/suggest", params={"q": prefix, "limit": MAX_SUGGEST_LIMIT})
+        suggestions = response.json() if response.status_code == 200 else []
+        passed = bool(suggestions) and all(s.startswith(prefix) for s in suggestions)
+        if prefix == term:
+            passed &= term in suggestions
+        ok &= passed
+        print(f"q={prefix!r}: {response.status_code}, {len(suggestions)} suggestions "
+              f"{suggestions[:5]} {'ok' if passed else 'FAILED'}")
+    return ok
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--url", default="", help="base url of a running worker; in-process when omitted")
+    p.add_argument("--wait", type=float, default=120, help="seconds to wait for the first index build")
+    p.add_argument("--sample", type=int, default=5000, help="prompts read when there are no categories or searches")
+    args = p.parse_args()
+
+    term = _expected_term(args.sample)
+    if not term:
+        raise SystemExit("nothing to suggest: no categories, search history or repeated prompt terms")
+    print(f"expecting {term!r}")
+    if args.url:
+        with httpx.Client(base_url=args.url, timeout=30) as client:
+            ok = run(client, term, args.wait)
+    else:
+        from fastapi.testclient import TestClient
+        from app.main import app
+        # Entering the client runs the startup hooks, which start the index
+        with TestClient(app) as client:
+            ok = run(client, term, args.wait)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Run EXPLAIN on the hot router queries and report which index each plan uses.
+
+Every query is built the same way its router builds it (same projection,
+filters and ORDER BY), compiled with its parameters and explained with
+FORMAT JSON. A query passes when its plan touches the index added for it in
+alembic revisions 4b8e2f6c1a7d / 7c3d9e1f2b4a. For cursor pages that is not
+enough (an index scan that filters every row from the start of the index
+still "uses" it), so those also have to show their seek key in the Index
+Cond of that index.
+
+On small dev databases the planner rightly prefers sequential scans; pass
+--no-seqscan to make it show whether the index is usable at all:
+  python -m app.scripts.explain_router_queries
+  python -m app.scripts.explain_router_queries --no-seqscan --analyze
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+
+from sqlalchemy import func
+
+from app import models
+from app.database import SessionLocal
+from app.pagination import GALLERY_PAGE_SIZE, after_date_key, after_quality_key
+from app.serialization import ART_CARD_COLUMNS
+from app.text_search import ranked_query, tsquery
+
+
+def _sample_ids(db):
+    owner_id = (
+        db.query(models.Art.owner_id)
+        .filter(models.Art.is_public == True)
+        .group_by(models.Art.owner_id)
+        .order_by(func.count().desc())
+        .limit(1)
+        .scalar()
+    )
+    generator_id = (
+        db.query(models.Art.owner_id)
+        .filter(models.Art.is_generated == True)
+        .group_by(models.Art.owner_id)
+        .order_by(func.count().desc())
+        .limit(1)
+        .scalar()
+    )
+    art_id = db.query(models.Like.art_id).limit(1).scalar() or db.query(models.Art.id).limit(1).scalar()
+    cursor = (
+        db.query(models.Art.quality_score, models.Art.id)
+        .filter(models.Art.is_public == True, models.Art.is_curated == True)
+        .order_by(models.Art.quality_score.desc().nullslast(), models.Art.id.desc())
+        .offset(50)
+        .first()
+    )
+    return owner_id or 0, generator_id or owner_id or 0, art_id or 0, cursor or (None, 0)
+
+
+def _feed(db, tier_filter):
+    q = db.query(*ART_CARD_COLUMNS).filter(models.Art.is_public == True, models.Art.src.isnot(None))
+    if tier_filter is not None:
+        q = q.filter(tier_filter)
+    return q.order_by(models.Art.quality_score.desc().nullslast(), models.Art.id.desc())
+
+
+def _gallery(db, *filters, seek: bool = False):
+    """A profile gallery page as the routers build it; `seek` starts after the first page."""
+    q = db.query(*ART_CARD_COLUMNS).filter(*filters)
+    order = (models.Art.date.desc(), models.Art.id.desc())
+    if seek:
+        last = q.with_entities(models.Art.date, models.Art.id).order_by(*order).offset(GALLERY_PAGE_SIZE - 1).first()
+        if last is not None:
+            q = q.filter(after_date_key(models.Art.date, models.Art.id, *last))
+    return q.order_by(*order).limit(GALLERY_PAGE_SIZE)
+
+
+def router_queries(db):
+    """(label, expected index, query, seek) for each hot router query.
+
+    `seek` is a fragment the Index Cond on the expected index must contain,
+    or None where any use of the index will do.
+    """
+    owner_id, generator_id, art_id, (score, last_id) = _sample_ids(db)
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    return [
+        ("GET /arts/?tier=all", "ix_arts_public_quality",
+         _feed(db, None).limit(50), None),
+        ("GET /arts/?tier=curated (snapshot build)", "ix_arts_curated_quality",
+         db.query(models.Art.quality_score, models.Art.id)
+         .filter(models.Art.is_public == True, models.Art.src.isnot(None), models.Art.is_curated == True)
+         .order_by(models.Art.quality_score.desc().nullslast(), models.Art.id.desc()), None),
+        ("GET /arts/?tier=premium (snapshot build)", "ix_arts_premium_quality",
+         db.query(models.Art.quality_score, models.Art.id)
+         .filter(models.Art.is_public == True, models.Art.src.isnot(None), models.Art.is_premium == True)
+         .order_by(models.Art.quality_score.desc().nullslast(), models.Art.id.desc()), None),
+        ("GET /arts/?tier=all&cursor=...", "ix_arts_public_quality",
+         _feed(db, None)
+         .filter(after_quality_key(models.Art.quality_score, models.Art.id, score, last_id)).limit(50),
+         "ROW(quality_score, id) <"),
+        ("GET /arts/?tier=all&cursor=... (NULL-score tail)", "ix_arts_public_quality",
+         _feed(db, None)
+         .filter(after_quality_key(models.Art.quality_score, models.Art.id, None, last_id)).limit(50),
+         "id <"),
+        ("GET /arts/{user_id}", "ix_arts_owner_public_date",
+         _gallery(db, models.Art.owner_id == owner_id, models.Art.is_public == True), None),
+        ("GET /arts/{user_id}?cursor=...", "ix_arts_owner_public_date",
+         _gallery(db, models.Art.owner_id == owner_id, models.Art.is_public == True, seek=True),
+         "ROW(date, id) <"),
+        ("GET /arts/generated/{user_id}", "ix_arts_owner_generated_date",
+         _gallery(db, models.Art.owner_id == generator_id, models.Art.is_generated == True), None),
+        ("credits: free generations used today", "ix_arts_owner_generated_date",
+         db.query(func.count(models.Art.id)).filter(
+             models.Art.owner_id == generator_id, models.Art.is_generated == True, models.Art.date >= today), None),
+        ("GET /arts/search/ (lexical fallback)", "ix_arts_search_vector",
+         ranked_query(db, tsquery("cyberpunk city"), models.Art.is_curated == True), None),
+        ("GET /arts/similar/{art_id} (keyword fallback)", "ix_arts_search_vector",
+         ranked_query(db, tsquery("neon or samurai or portrait"), models.Art.id != art_id, limit=20), None),
+        ("GET /arts/similar/{art_id} (random fill)", "arts_pkey",
+         db.query(*ART_CARD_COLUMNS).filter(models.Art.is_public == True, models.Art.id != art_id,
+                                            models.Art.id >= art_id).order_by(models.Art.id).limit(20), None),
+        ("likes of one art", "ix_likes_art_id",
+         db.query(func.count()).select_from(models.Like).filter(models.Like.art_id == art_id), None),
+    ]
+
+
+def _index_names(plan: dict) -> set:
+    names = set()
+    if "Index Name" in plan:
+        names.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        names |= _index_names(child)
+    return names
+
+
+def _index_conds(plan: dict, index: str) -> list:
+    """Index Cond of every plan node that scans `index`, with table prefixes dropped."""
+    conds = []
+    if plan.get("Index Name") == index and "Index Cond" in plan:
+        conds.append(plan["Index Cond"].replace("arts.", ""))
+    for child in plan.get("Plans", []):
+        conds += _index_conds(child, index)
+    return conds
+
+
+def _node_types(plan: dict) -> list:
+    types = [plan["Node Type"]]
+    for child in plan.get("Plans", []):
+        types += _node_types(child)
+    return types
+
+
+def explain(db, query, analyze: bool) -> dict:
+    # psycopg2 interpolates the parameters client-side, so this plans the literal query
+    compiled = query.statement.compile(dialect=db.get_bind().dialect, compile_kwargs={"render_postcompile": True})
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+    raw = db.connection().exec_driver_sql(f"EXPLAIN ({options}) {compiled}", compiled.params).scalar()
+    return (json.loads(raw) if isinstance(raw, str) else raw)[0]
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--analyze", action="store_true", help="EXPLAIN ANALYZE (executes the queries)")
+    p.add_argument("--no-seqscan", action="store_true", help="SET enable_seqscan = off for this session")
+    p.add_argument("--verbose", action="store_true", help="print the full plan tree")
+    args = p.parse_args()
+
+    db = SessionLocal()
+    failures = 0
+    try:
+        if args.no_seqscan:
+            db.connection().exec_driver_sql("SET enable_seqscan = off")
+        for label, expected, query, seek in router_queries(db):
+            result = explain(db, query, args.analyze)
+            plan = result["Plan"]
+            used = _index_names(plan)
+            conds = _index_conds(plan, expected)
+            ok = expected in used and (seek is None or any(seek in cond for cond in conds))
+            failures += not ok
+            timing = f" {result['Execution Time']:.2f}ms" if args.analyze else ""
+            print(f"[{'ok' if ok else 'MISS'}] {label}")
+            print(f"       expected {expected}; plan: {' > '.join(_node_types(plan))}"
+                  f" via {', '.join(sorted(used)) or 'no index'} (cost {plan['Total Cost']:.1f}){timing}")
+            if seek is not None:
+                print(f"       expected Index Cond with {seek!r}; got {'; '.join(conds) or 'none'}")
+            if args.verbose:
+                print(json.dumps(plan, indent=2))
+    finally:
+        db.rollback()
+        db.close()
+
+    if failures:
+        print(f"\n{failures} queries did not use their index (or did not seek on it)"
+              + ("" if args.no_seqscan else " (retry with --no-seqscan on small databases)"))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Re-embed the Prompts and Categories collections for another embedding backend.
+
+Documents (and metadata) are read page by page from the collection of the
+source backend and upserted, with fresh vectors, into the target backend's own
+collection (see app/embeddings.collection_name). The source is never modified,
+so the switch is just EMBEDDING_BACKEND/EMBEDDING_MODEL on the API once this
+has finished; re-running with --resume only embeds ids the target is missing.
+
+  python -m app.scripts.reembed_collections --backend onnx
+  python -m app.scripts.reembed_collections --backend sentence-transformers \
+      --model all-mpnet-base-v2 --collections Prompts --resume
+"""
+import argparse
+import time
+
+from app.chroma_services import chroma
+from app.embeddings import DEFAULT_MODELS, EMBEDDING_BACKENDS, collection_name, get_embedding_function
+
+
+def _upsert(target, ids, embeddings, documents, metadatas):
+    # Chroma rejects empty/None metadata entries, so rows without metadata go in their own call
+    with_meta = [i for i, m in enumerate(metadatas) if m]
+    without_meta = [i for i, m in enumerate(metadatas) if not m]
+    if with_meta:
+        target.upsert(
+            ids=[ids[i] for i in with_meta],
+            embeddings=[embeddings[i] for i in with_meta],
+            documents=[documents[i] for i in with_meta],
+            metadatas=[metadatas[i] for i in with_meta],
+        )
+    if without_meta:
+        target.upsert(
+            ids=[ids[i] for i in without_meta],
+            embeddings=[embeddings[i] for i in without_meta],
+            documents=[documents[i] for i in without_meta],
+        )
+
+
+def reembed(base: str, source_backend: str, source_model: str, backend: str, model: str, page_size: int, resume: bool):
+    source_name = collection_name(base, source_backend, source_model)
+    target_name = collection_name(base, backend, model)
+    if source_name == target_name:
+        raise SystemExit(f"{base}: source and target are both {source_name}")
+
+    source = chroma.client.get_collection(name=source_name)
+    function = get_embedding_function(backend, model)
+    target = chroma.client.get_or_create_collection(
+        name=target_name, metadata={"hnsw:space": "cosine"}, embedding_function=function
+    )
+    total = source.count()
+    print(f"{source_name} ({total} docs) -> {target_name} [{backend}:{function.model}]")
+
+    done = skipped = 0
+    t0 = time.time()
+    for offset in range(0, total, page_size):
+        page = source.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+        rows = [
+            (id_, doc, meta)
+            for id_, doc, meta in zip(page["ids"], page["documents"], page["metadatas"] or [None] * len(page["ids"]))
+            if doc
+        ]
+        if resume and rows:
+            present = set(target.get(ids=[id_ for id_, _, _ in rows], include=[])["ids"])
+            skipped += len(present)
+            rows = [row for row in rows if row[0] not in present]
+        if not rows:
+            continue
+        ids, documents, metadatas = (list(column) for column in zip(*rows))
+        _upsert(target, ids, function(documents), documents, metadatas)
+        done += len(rows)
+        rate = done / max(time.time() - t0, 1e-9)
+        print(f"  {min(offset + page_size, total)}/{total} read, {done} embedded, {skipped} skipped ({rate:.0f} docs/s)")
+    print(f"{target_name}: {target.count()} docs")
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--backend", required=True, choices=EMBEDDING_BACKENDS)
+    p.add_argument("--model", default="")
+    p.add_argument("--source-backend", default="openai", choices=EMBEDDING_BACKENDS)
+    p.add_argument("--source-model", default="")
+    p.add_argument("--collections", nargs="+", default=["Prompts", "Categories"])
+    p.add_argument("--page-size", type=int, default=512)
+    p.add_argument("--resume", action="store_true", help="skip ids already present in the target")
+    args = p.parse_args()
+
+    if chroma.client is None:
+        raise SystemExit("ChromaDB is not reachable")
+    model = args.model or DEFAULT_MODELS[args.backend]
+    source_model = args.source_model or DEFAULT_MODELS[args.source_backend]
+    for base in args.collections:
+        reembed(base, args.source_backend, source_model, args.backend, model, args.page_size, args.resume)
+
+
+if __name__ == "__main__":
+    main()
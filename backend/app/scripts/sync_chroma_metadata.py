@@ -0,0 +1,106 @@
+"""
+Copy each art's visibility and tier columns onto its Prompts entry in Chroma.
+
+Search passes the tier as a Chroma `where` filter (see app/search.py), so the
+metadata must follow the database. The CLIP image collection, when it has
+been backfilled, carries the same metadata and is synced too. New uploads are written with it and
+/set-public updates it; the judge scripts re-tier thousands of rows in SQL and
+pass the ids they changed to --ids-file afterwards. Run it once on its own
+after deploying, to backfill entries added before metadata existed: a run over
+every art records the backfill in feed_state, which is what turns on the tier
+`where` filter of vector search (SEARCH_VECTOR_FILTERS=auto).
+
+  python -m app.scripts.sync_chroma_metadata
+  python -m app.scripts.sync_chroma_metadata --judged-only --page-size 2000
+  python -m app.scripts.sync_chroma_metadata --ids-file changed_ids.txt
+  printf '12\n34\n' | python -m app.scripts.sync_chroma_metadata --ids-file -
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app import models
+from app.chroma_services import ART_METADATA_FIELDS, METADATA_BACKFILL_STATE, collection_prompts, sync_prompt_metadata
+from app.database import SessionLocal
+from app.services.embedding_service import image_collection
+
+
+def _read_ids(path: str):
+    """Art ids, whitespace-separated, from a file or stdin ("-")."""
+    stream = sys.stdin if path == "-" else open(path)
+    try:
+        return sorted({int(token) for token in stream.read().split()})
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def _pages(db, columns, page_size: int, judged_only: bool, ids=None):
+    """Rows of `columns` in id order, `page_size` at a time; only `ids` when given."""
+    if ids is not None:
+        for start in range(0, len(ids), page_size):
+            rows = db.query(*columns).filter(
+                models.Art.id.in_(ids[start:start + page_size])
+            ).order_by(models.Art.id).all()
+            if rows:
+                yield rows
+        return
+    last_id = 0
+    while True:
+        q = db.query(*columns).filter(models.Art.id > last_id)
+        if judged_only:
+            q = q.filter(models.Art.judged_at.isnot(None))
+        rows = q.order_by(models.Art.id).limit(page_size).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        yield rows
+
+
+def _record_backfill(db) -> None:
+    stmt = pg_insert(models.FeedState.__table__).values(
+        name=METADATA_BACKFILL_STATE, version=1, updated_at=datetime.utcnow()
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.FeedState.name],
+        set_={"version": models.FeedState.version + 1, "updated_at": datetime.utcnow()},
+    )
+    db.execute(stmt)
+    db.commit()
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--page-size", type=int, default=1000)
+    p.add_argument("--judged-only", action="store_true", help="only arts the judge has scored")
+    p.add_argument("--ids-file", help="only these art ids, whitespace-separated; - reads stdin")
+    args = p.parse_args()
+
+    if collection_prompts is None:
+        raise SystemExit("Prompts collection is not available")
+
+    images = image_collection(create=False)
+    columns = [models.Art.id] + [getattr(models.Art, field) for field in ART_METADATA_FIELDS]
+    ids = _read_ids(args.ids_file) if args.ids_file else None
+    db = SessionLocal()
+    synced = read = 0
+    t0 = time.time()
+    try:
+        for rows in _pages(db, columns, args.page_size, args.judged_only, ids):
+            read += len(rows)
+            synced += sync_prompt_metadata(rows)
+            if images is not None:
+                sync_prompt_metadata(rows, collection=images)
+            print(f"  up to id {rows[-1].id}: {read} read, {synced} synced ({read / max(time.time() - t0, 1e-9):.0f} rows/s)")
+        if ids is None and not args.judged_only:
+            _record_backfill(db)
+    finally:
+        db.close()
+    print(f"done: metadata sent for {synced} arts in {time.time() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
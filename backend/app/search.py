@@ -0,0 +1,312 @@
+"""
+Hybrid art search: Chroma vector ranking + Postgres full-text ranking, merged
+with reciprocal-rank fusion (RRF).
+
+Exact-term queries (artist or LoRA names) are where embeddings rank poorly and
+the text index is strongest, and vice versa for descriptive queries, so each
+source only needs a shallow candidate list; /arts/search/ only asks for deeper
+lists (up to SEARCH_MAX_DEPTH) when a client pages past the first ranking.
+Both run concurrently; whatever has answered when the SEARCH_BUDGET_MS budget
+runs out is fused (past the budget, the first source to answer is used), so
+one slow source costs at most the budget. SEARCH_TIMEOUT_MS caps the wait when
+neither has answered. Each source has its own worker pool, so calls stuck on a
+hung embedding API cannot queue the full-text queries behind them; a source
+whose workers are all still busy is skipped rather than queued, and calls that
+missed the budget are cancelled while they are still waiting for a worker.
+
+Every search reports the path that served it (hybrid, vector, lexical, or none
+when nothing answered in time) and per-source timings; search_metrics keeps
+the running counts and latency percentiles for /search-stats.
+
+Env:
+  SEARCH_MODE           - hybrid (default) | vector | lexical
+  SEARCH_VECTOR_DEPTH   - Chroma n_results per query
+  SEARCH_LEXICAL_DEPTH  - full-text candidates per query
+  SEARCH_MAX_DEPTH      - deepest per-source list fetched for later result pages
+  SEARCH_RRF_K          - RRF damping constant (60 in the original paper)
+  SEARCH_BUDGET_MS      - latency budget before answering with what has arrived
+  SEARCH_TIMEOUT_MS     - give up (empty result) when no source has answered by then
+  SEARCH_DEGRADED_CACHE_TTL - seconds a ranking missing a source stays cached
+  SEARCH_RESULT_LIMIT   - ids returned after fusion
+  SEARCH_VECTOR_FILTERS - auto (default) | true | false: pass tier filters to
+                          Chroma as `where`. auto waits until a full
+                          sync_chroma_metadata run has recorded the backfill in
+                          feed_state, since entries without metadata never match
+  VECTOR_MAX_DISTANCE   - cosine distance past which a vector hit is dropped, in
+                          search and in the similar / by-image results alike
+"""
+import os
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from . import models
+from .chroma_services import METADATA_BACKFILL_STATE, chroma, collection_prompts
+from .database import SessionLocal
+from .text_search import lexical_ids
+
+logger = logging.getLogger(__name__)
+
+SEARCH_MODE = os.getenv("SEARCH_MODE", "hybrid").lower()
+SEARCH_VECTOR_DEPTH = int(os.getenv("SEARCH_VECTOR_DEPTH", "50"))
+SEARCH_LEXICAL_DEPTH = int(os.getenv("SEARCH_LEXICAL_DEPTH", "50"))
+SEARCH_RRF_K = int(os.getenv("SEARCH_RRF_K", "60"))
+SEARCH_BUDGET_MS = float(os.getenv("SEARCH_BUDGET_MS", "800"))
+SEARCH_TIMEOUT_MS = float(os.getenv("SEARCH_TIMEOUT_MS", "5000"))
+SEARCH_DEGRADED_CACHE_TTL = int(os.getenv("SEARCH_DEGRADED_CACHE_TTL", "30"))
+SEARCH_MAX_DEPTH = int(os.getenv("SEARCH_MAX_DEPTH", "400"))
+SEARCH_RESULT_LIMIT = int(os.getenv("SEARCH_RESULT_LIMIT", "100"))
+SEARCH_VECTOR_FILTERS = os.getenv("SEARCH_VECTOR_FILTERS", "auto").lower()
+BACKFILL_CHECK_SECONDS = 60
+# 1.0 = orthogonal: at or past it the vectors share nothing
+VECTOR_MAX_DISTANCE = float(os.getenv("VECTOR_MAX_DISTANCE", "1.0"))
+
+SOURCES = ("vector", "lexical")
+_workers = int(os.getenv("SEARCH_WORKERS", "8"))
+_executors = {source: ThreadPoolExecutor(max_workers=_workers, thread_name_prefix=f"search-{source}") for source in SOURCES}
+_in_flight = {source: 0 for source in SOURCES}
+_in_flight_lock = threading.Lock()
+
+
+class SearchMetrics:
+    """Per-source latency samples and outcome counters, plus which path served each search."""
+
+    def __init__(self, samples: int = 2000):
+        self._latencies = {source: deque(maxlen=samples) for source in SOURCES}
+        self._counts = {source: {"calls": 0, "errors": 0, "over_budget": 0, "saturated": 0} for source in SOURCES}
+        self._served_by: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record_source(self, source: str, ms: float, ok: bool) -> None:
+        with self._lock:
+            self._latencies[source].append(ms)
+            self._counts[source]["calls"] += 1
+            if not ok:
+                self._counts[source]["errors"] += 1
+
+    def record_search(self, path: str, dropped: Sequence[str], saturated: Sequence[str] = ()) -> None:
+        with self._lock:
+            self._served_by[path] = self._served_by.get(path, 0) + 1
+            for source in dropped:
+                self._counts[source]["over_budget"] += 1
+            for source in saturated:
+                self._counts[source]["saturated"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            sources = {}
+            for source in SOURCES:
+                values = sorted(self._latencies[source])
+                sources[source] = {
+                    **self._counts[source],
+                    **{
+                        f"p{q}_ms": round(values[min(len(values) - 1, int(len(values) * q / 100))], 1) if values else None
+                        for q in (50, 95, 99)
+                    },
+                }
+            return {
+                "budget_ms": SEARCH_BUDGET_MS,
+                "timeout_ms": SEARCH_TIMEOUT_MS,
+                "mode": SEARCH_MODE,
+                "served_by": dict(self._served_by),
+                "sources": sources,
+            }
+
+
+search_metrics = SearchMetrics()
+
+
+class SearchOutcome(NamedTuple):
+    rankings: List[List[int]]  # one ranked id list per query
+    path: str                  # hybrid | vector | lexical | none
+    timings_ms: Dict[str, float]  # sources that answered within the budget
+    degraded: bool             # a source was dropped (over budget, failed or saturated)
+    more: Optional[List[bool]] = None  # per query: a list was cut at its depth or limit
+
+
+def _timed(source: str, fn, *args):
+    """Run a source and record its latency, including runs that finish after the budget."""
+    t0 = time.perf_counter()
+    ok = False
+    try:
+        result = fn(*args)
+        ok = True
+        return result, (time.perf_counter() - t0) * 1000
+    finally:
+        search_metrics.record_source(source, (time.perf_counter() - t0) * 1000, ok)
+
+
+class _BackfillMarker:
+    """Whether the Prompts metadata backfill has finished, re-read until it has."""
+
+    def __init__(self):
+        self._done = False
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def done(self) -> bool:
+        if self._done:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            if not self._done and now - self._checked_at >= BACKFILL_CHECK_SECONDS:
+                self._checked_at = now
+                db = SessionLocal()
+                try:
+                    self._done = db.query(models.FeedState.name).filter(
+                        models.FeedState.name == METADATA_BACKFILL_STATE
+                    ).first() is not None
+                except Exception as e:
+                    logger.warning(f"could not read the chroma metadata backfill state: {e}")
+                finally:
+                    db.close()
+        return self._done
+
+
+_metadata_backfill = _BackfillMarker()
+
+
+def vector_filters_enabled() -> bool:
+    if SEARCH_VECTOR_FILTERS == "auto":
+        return _metadata_backfill.done()
+    return SEARCH_VECTOR_FILTERS == "true"
+
+
+def _release(source: str) -> None:
+    with _in_flight_lock:
+        _in_flight[source] -= 1
+
+
+def _submit(source: str, fn, *args):
+    """Run `fn` on the source's pool, or return None when every worker is still busy."""
+    with _in_flight_lock:
+        if _in_flight[source] >= _workers:
+            return None
+        _in_flight[source] += 1
+    # Also called for cancelled futures, so a call frees its slot however it ends
+    future = _executors[source].submit(_timed, source, fn, *args)
+    future.add_done_callback(lambda _: _release(source))
+    return future
+
+
+def vector_ids(query: str, depth: int = SEARCH_VECTOR_DEPTH, where: Optional[dict] = None) -> List[int]:
+    return vector_ids_many([query], depth, where)[0]
+
+
+def vector_ids_many(queries: List[str], depth: int = SEARCH_VECTOR_DEPTH, where: Optional[dict] = None) -> List[List[int]]:
+    """Nearest Prompts ids for each query: one embedding call and one multi-query Chroma request."""
+    kwargs = {"where": where} if where and vector_filters_enabled() else {}
+    results = chroma.query_texts(collection_prompts, queries, include=["distances"], n_results=depth, **kwargs)
+    return [vector_ranking(ids, distances) for ids, distances in zip(results["ids"], results["distances"])]
+
+
+def vector_ranking(ids: List[str], distances: List[float], exclude: Optional[int] = None,
+                   max_distance: float = VECTOR_MAX_DISTANCE) -> List[int]:
+    """Art ids of one Chroma query result, nearest first, without hits past `max_distance`."""
+    return [
+        int(id_) for id_, distance in zip(ids, distances)
+        if distance < max_distance and id_.isdigit() and int(id_) != exclude
+    ]
+
+
+def _lexical_ids_many(queries: List[str], filters: list, depth: int) -> List[List[int]]:
+    # Runs on a search worker thread, so it cannot share the request's Session
+    db = SessionLocal()
+    try:
+        return [lexical_ids(db, query, *filters, limit=depth) for query in queries]
+    finally:
+        db.close()
+
+
+def reciprocal_rank_fusion(rankings: Sequence[List[int]], k: int = SEARCH_RRF_K) -> List[int]:
+    """Ids ordered by sum(1 / (k + rank)); ties keep the order of the earlier ranking."""
+    scores: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, art_id in enumerate(ranking, start=1):
+            scores[art_id] = scores.get(art_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=scores.__getitem__, reverse=True)
+
+
+def search_ids(query: str, filters: Sequence = (), where: Optional[dict] = None, **kwargs) -> List[int]:
+    """Ranked art ids for `query` (see search_ids_many)."""
+    return search_ids_many([query], filters, where, **kwargs).rankings[0]
+
+
+def search_ids_many(
+    queries: List[str],
+    filters: Sequence = (),
+    where: Optional[dict] = None,
+    mode: str = SEARCH_MODE,
+    vector_depth: int = SEARCH_VECTOR_DEPTH,
+    lexical_depth: int = SEARCH_LEXICAL_DEPTH,
+    budget_ms: float = SEARCH_BUDGET_MS,
+    timeout_ms: float = SEARCH_TIMEOUT_MS,
+    limit: int = SEARCH_RESULT_LIMIT,
+) -> SearchOutcome:
+    """Ranked art ids for each of `queries`, in the same order.
+
+    `filters` narrow the lexical source and `where` (the same conditions as a
+    Chroma metadata filter) the vector source, so both return a full list of
+    candidates inside the tier. All queries share one vector request and one
+    database session, and the budget applies to the batch as a whole.
+    """
+    if not queries:
+        return SearchOutcome([], "none", {}, False)
+    futures = {}
+    saturated = []
+
+    def submit(source, fn, *args):
+        future = _submit(source, fn, *args)
+        if future is None:
+            saturated.append(source)
+        else:
+            futures[future] = source
+
+    if mode in ("hybrid", "vector") and collection_prompts:
+        submit("vector", vector_ids_many, queries, vector_depth, where)
+    # Also the fallback when the vector workers are all stuck
+    if mode in ("hybrid", "lexical") or not futures:
+        submit("lexical", _lexical_ids_many, queries, list(filters), lexical_depth)
+    for source in saturated:
+        logger.warning(f"{source} search skipped for {queries!r}: all {_workers} workers busy")
+
+    results: Dict[str, List[List[int]]] = {}
+    timings: Dict[str, float] = {}
+    failed = []
+    start = time.monotonic()
+    budget_at, timeout_at = start + budget_ms / 1000, start + max(timeout_ms, budget_ms) / 1000
+    pending = set(futures)
+    while pending:
+        now = time.monotonic()
+        if now >= timeout_at or (now >= budget_at and results):
+            break
+        wait_until = budget_at if now < budget_at else timeout_at
+        done, pending = wait(pending, timeout=wait_until - now, return_when=FIRST_COMPLETED)
+        for future in done:
+            source = futures[future]
+            try:
+                results[source], timings[source] = future.result()
+            except Exception as e:
+                failed.append(source)
+                logger.warning(f"{source} search failed for {queries!r}: {e}")
+    dropped = [futures[future] for future in pending]
+    for future in pending:
+        future.cancel()  # only stops calls still queued; running ones finish on their worker
+    for source in dropped:
+        logger.info(f"{source} search over the {budget_ms:.0f}ms budget for {queries!r}; answered without it")
+
+    # Vector first, so it wins RRF ties
+    sources = [source for source in SOURCES if source in results]
+    path = "hybrid" if len(sources) == 2 else (sources[0] if sources else "none")
+    search_metrics.record_search(path, dropped, saturated)
+    depths = {"vector": vector_depth, "lexical": lexical_depth}
+    rankings, more = [], []
+    for i in range(len(queries)):
+        fused = reciprocal_rank_fusion([results[source][i] for source in sources])
+        rankings.append(fused[:limit])
+        # A deeper search can only find more when some list was cut off
+        more.append(len(fused) > limit or any(len(results[source][i]) >= depths[source] for source in sources))
+    return SearchOutcome(rankings, path, timings, bool(dropped or failed or saturated), more)
@@ -1,36 +1,204 @@
-from chromadb.utils.embedding_functions import OpenCLIPEmbeddingFunction
-from chromadb.utils.data_loaders import ImageLoader
-import io
-from PIL import Image
-import numpy as np
-
-class MultimodalEmbeddingService:
-    def __init__(self):
-        self.embedding_function = OpenCLIPEmbeddingFunction()
-        self.data_loader = ImageLoader()
-        
-    def process_image(self, image_data):
-        """Process binary image data into format needed for embeddings"""
-        if isinstance(image_data, bytes):
-            image = Image.open(io.BytesIO(image_data))
-            # Convert to RGB if needed (handles PNG with transparency)
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            # Convert to numpy array as expected by OpenCLIP
-            return np.array(image)
-        return None
-        
-    def get_text_embedding(self, text):
-        """Get embedding for text"""
-        if not text:
-            return None
-        return self.embedding_function([text])[0]
-    
-    def get_image_embedding(self, image_data):
-        """Get embedding for image from binary data"""
-        if not image_data:
-            return None
-        image_array = self.process_image(image_data)
-        if image_array is not None:
-            return self.embedding_function.get_image_embeddings([image_array])[0]
-        return None 
\ No newline at end of file
+"""
+CLIP (OpenCLIP) text and image embeddings on CPU, for search by image.
+
+The model is loaded once per process on first use. Image embeddings are
+computed in batches: the backfill passes whole pages, and concurrent
+/arts/search/by-image requests are coalesced by ImageEmbeddingBatcher into
+one forward pass instead of one pass per request.
+
+Decoding and preprocessing (resize, crop, normalize) run on the caller's
+thread; only the forward pass is serialized through the batcher.
+
+Env:
+  CLIP_MODEL           - OpenCLIP architecture
+  CLIP_CHECKPOINT      - pretrained weights tag
+  CLIP_BATCH_SIZE      - images per forward pass
+  CLIP_BATCH_WAIT_MS   - how long the batcher waits to fill a batch
+  CLIP_THREADS         - torch intra-op threads (0 = torch default)
+  CLIP_IMAGE_COLLECTION - Chroma collection of art image embeddings
+
+Requires `pip install open-clip-torch` (pulls in torch).
+"""
+import io
+import os
+import re
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from typing import List, Optional
+
+from PIL import Image
+
+CLIP_MODEL = os.getenv("CLIP_MODEL", "ViT-B-32")
+CLIP_CHECKPOINT = os.getenv("CLIP_CHECKPOINT", "laion2b_s34b_b79k")
+CLIP_BATCH_SIZE = int(os.getenv("CLIP_BATCH_SIZE", "32"))
+CLIP_BATCH_WAIT_MS = float(os.getenv("CLIP_BATCH_WAIT_MS", "5"))
+CLIP_THREADS = int(os.getenv("CLIP_THREADS", "0"))
+CLIP_IMAGE_COLLECTION = os.getenv(
+    "CLIP_IMAGE_COLLECTION",
+    "Images__clip_" + re.sub(r"[^A-Za-z0-9_.-]+", "-", f"{CLIP_MODEL}_{CLIP_CHECKPOINT}"),
+)
+
+
+class MultimodalEmbeddingService:
+    """OpenCLIP model plus its preprocessing, producing L2-normalized embeddings."""
+
+    def __init__(self, model_name: str = CLIP_MODEL, checkpoint: str = CLIP_CHECKPOINT):
+        import open_clip
+        import torch
+
+        if CLIP_THREADS > 0:
+            torch.set_num_threads(CLIP_THREADS)
+        self._torch = torch
+        self.model_name = model_name
+        self.checkpoint = checkpoint
+        model, _, preprocess = open_clip.create_model_and_transforms(model_name, pretrained=checkpoint, device="cpu")
+        model.eval()
+        self._model = model
+        self._preprocess = preprocess
+        self._tokenizer = open_clip.get_tokenizer(model_name)
+
+    def preprocess(self, image_data: bytes):
+        """Decode image bytes into the model's input tensor (RGB, resized, normalized)."""
+        with Image.open(io.BytesIO(image_data)) as image:
+            # Convert to RGB if needed (handles PNG with transparency)
+            return self._preprocess(image.convert("RGB"))
+
+    def embed_tensors(self, tensors, batch_size: int = CLIP_BATCH_SIZE) -> List[List[float]]:
+        """One forward pass per `batch_size` preprocessed images."""
+        embeddings: List[List[float]] = []
+        for start in range(0, len(tensors), batch_size):
+            batch = self._torch.stack(tensors[start:start + batch_size])
+            with self._torch.inference_mode():
+                features = self._model.encode_image(batch)
+                features /= features.norm(dim=-1, keepdim=True)
+            embeddings.extend(features.cpu().numpy().tolist())
+        return embeddings
+
+    def get_image_embeddings(self, images: List[bytes]) -> List[List[float]]:
+        return self.embed_tensors([self.preprocess(image_data) for image_data in images])
+
+    def get_image_embedding(self, image_data: bytes) -> Optional[List[float]]:
+        """Get embedding for image from binary data"""
+        if not image_data:
+            return None
+        return self.get_image_embeddings([image_data])[0]
+
+    def get_text_embedding(self, text: str) -> Optional[List[float]]:
+        """Get embedding for text (same space as the image embeddings)"""
+        if not text:
+            return None
+        with self._torch.inference_mode():
+            features = self._model.encode_text(self._tokenizer([text]))
+            features /= features.norm(dim=-1, keepdim=True)
+        return features[0].cpu().numpy().tolist()
+
+
+_service: Optional[MultimodalEmbeddingService] = None
+_service_lock = threading.Lock()
+
+
+def get_multimodal_service() -> MultimodalEmbeddingService:
+    """Process-wide service; the model is loaded by the first caller."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = MultimodalEmbeddingService()
+    return _service
+
+
+class ImageEmbeddingBatcher:
+    """Coalesces concurrent single-image requests into batched forward passes.
+
+    submit() takes a preprocessed tensor and returns a Future; one daemon
+    thread drains the queue. A batch closes CLIP_BATCH_WAIT_MS after its oldest
+    request was submitted, so time spent queued behind a slow forward pass
+    counts against that one deadline instead of each later arrival restarting
+    the wait.
+    """
+
+    def __init__(self, batch_size: int = CLIP_BATCH_SIZE, wait_ms: float = CLIP_BATCH_WAIT_MS):
+        self.batch_size = batch_size
+        self.wait_s = wait_ms / 1000
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, tensor) -> Future:
+        self._ensure_thread()
+        future: Future = Future()
+        self._queue.put((tensor, future, time.monotonic() + self.wait_s))
+        return future
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="clip-batcher", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = batch[0][2]
+            try:
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    batch.append(self._queue.get_nowait() if remaining <= 0 else self._queue.get(timeout=remaining))
+            except queue.Empty:
+                pass
+            try:
+                embeddings = get_multimodal_service().embed_tensors([tensor for tensor, _, _ in batch])
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            for (_, future, _), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
+
+
+image_batcher = ImageEmbeddingBatcher()
+
+
+# Seconds between lookups while the image collection does not exist yet
+IMAGE_COLLECTION_RECHECK_SECONDS = 60
+
+_image_collection = None
+_image_collection_checked_at = 0.0
+_image_collection_lock = threading.Lock()
+
+
+def image_collection(create: bool = True):
+    """The Chroma collection of art image embeddings (vectors are supplied, so no embedding function).
+
+    The handle is cached per process like the Prompts/Categories collections.
+    With create=False, None when it has not been backfilled yet; Chroma is
+    asked again at most every IMAGE_COLLECTION_RECHECK_SECONDS.
+    """
+    global _image_collection, _image_collection_checked_at
+    from ..chroma_services import chroma
+
+    if _image_collection is not None:
+        return _image_collection
+    if chroma.client is None:
+        return None
+    with _image_collection_lock:
+        if _image_collection is not None:
+            return _image_collection
+        if create:
+            _image_collection = chroma.client.get_or_create_collection(
+                name=CLIP_IMAGE_COLLECTION, metadata={"hnsw:space": "cosine"}, embedding_function=None
+            )
+        elif time.monotonic() - _image_collection_checked_at >= IMAGE_COLLECTION_RECHECK_SECONDS:
+            _image_collection_checked_at = time.monotonic()
+            try:
+                _image_collection = chroma.client.get_collection(name=CLIP_IMAGE_COLLECTION, embedding_function=None)
+            except Exception:
+                pass
+        return _image_collection
@@ -0,0 +1,285 @@
+"""
+Search-as-you-type suggestions from an in-memory prefix index.
+
+Terms come from three sources, weighted by how often they occur:
+  - SearchHistory.query       (what people actually searched for)
+  - category names
+  - word 1..SUGGEST_MAX_NGRAM-grams of art prompts, taken within each
+    comma-separated phrase so they stay readable ("studio ghibli", not "ghibli 8k")
+
+The index is a sorted array of terms, so the completions of a prefix are one
+contiguous range found with two bisects; a request never touches Postgres or
+Chroma. The heaviest terms of that range come from a max segment tree over
+the weights (one O(log n) range query per suggestion), so a common prefix
+with thousands of completions still returns its top terms, whatever their
+alphabetical position. One- and two-character prefixes are answered from
+lists precomputed when the array is built.
+
+A background thread refreshes the index every SUGGEST_REFRESH_SECONDS. Each
+refresh only reads rows with ids above the last ones it saw and folds their
+counts into the running totals before the array is re-sorted and swapped in.
+Every SUGGEST_REBUILD_SECONDS the totals are rebuilt from scratch instead, which
+picks up older arts made public since (and drops ones hidden or deleted).
+
+Env:
+  SUGGEST_ENABLED           - "false" to skip building the index
+  SUGGEST_REFRESH_SECONDS   - interval between incremental refreshes
+  SUGGEST_REBUILD_SECONDS   - interval between full rebuilds
+  SUGGEST_MAX_NGRAM         - longest prompt n-gram indexed
+  SUGGEST_MIN_COUNT         - prompt n-grams seen fewer times are not suggested
+  SUGGEST_MAX_TERMS         - size cap of the suggestion array
+"""
+import os
+import re
+import time
+import heapq
+import logging
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from . import models
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+SUGGEST_ENABLED = os.getenv("SUGGEST_ENABLED", "true").lower() == "true"
+SUGGEST_REFRESH_SECONDS = int(os.getenv("SUGGEST_REFRESH_SECONDS", "300"))
+SUGGEST_REBUILD_SECONDS = int(os.getenv("SUGGEST_REBUILD_SECONDS", "21600"))
+SUGGEST_MAX_NGRAM = int(os.getenv("SUGGEST_MAX_NGRAM", "3"))
+SUGGEST_MIN_COUNT = int(os.getenv("SUGGEST_MIN_COUNT", "3"))
+SUGGEST_MAX_TERMS = int(os.getenv("SUGGEST_MAX_TERMS", "200000"))
+
+# A searched query counts for more than a term that merely appears in prompts
+HISTORY_WEIGHT = 5.0
+CATEGORY_WEIGHT = 50.0
+
+SUGGEST_LIMIT = 10
+MAX_SUGGEST_LIMIT = 25
+# Prefixes this short get precomputed answers instead of a range query
+HEAD_PREFIX_LENGTH = 2
+# Sorts after every character a normalized term can contain
+_PREFIX_END = "\uffff"
+
+_PAGE_SIZE = 5000
+_WORD = re.compile(r"[a-z0-9][a-z0-9'\-]*")
+# n-grams starting or ending with these ("of a", "by greg") are never useful completions
+_STOPWORDS = frozenset("a an and at by for from in is of on or the to with".split())
+
+
+def normalize_term(text: str) -> str:
+    return " ".join(_WORD.findall(text.lower()))
+
+
+def prompt_ngrams(prompt: str, max_n: int = SUGGEST_MAX_NGRAM):
+    """Distinct word n-grams of a prompt, never spanning a comma/period boundary."""
+    grams = set()
+    for phrase in re.split(r"[,.;:|()\[\]{}<>]", prompt.lower()):
+        words = _WORD.findall(phrase)
+        for n in range(1, max_n + 1):
+            for i in range(len(words) - n + 1):
+                if words[i] in _STOPWORDS or words[i + n - 1] in _STOPWORDS:
+                    continue
+                gram = " ".join(words[i:i + n])
+                if len(gram) >= 3 and not gram.isdigit():
+                    grams.add(gram)
+    return grams
+
+
+def _heavier(weights: List[float], i: int, j: int) -> int:
+    """Index of the heavier term; the alphabetically first one on a tie."""
+    if weights[j] > weights[i] or (weights[j] == weights[i] and j < i):
+        return j
+    return i
+
+
+def _max_tree(weights: List[float]) -> array:
+    """Segment tree over `weights`: node p holds the index of the heaviest term below it, leaves at n..2n-1."""
+    n = len(weights)
+    tree = array("i", range(-n, n))  # nodes 1..n-1 are overwritten below; node 0 is unused
+    for p in range(n - 1, 0, -1):
+        tree[p] = _heavier(weights, tree[2 * p], tree[2 * p + 1])
+    return tree
+
+
+def _range_best(tree: array, weights: List[float], lo: int, hi: int) -> int:
+    """Index of the heaviest term in [lo, hi) (non-empty)."""
+    n = len(tree) // 2
+    best = -1
+    lo += n
+    hi += n
+    while lo < hi:
+        if lo & 1:
+            best = tree[lo] if best < 0 else _heavier(weights, best, tree[lo])
+            lo += 1
+        if hi & 1:
+            hi -= 1
+            best = tree[hi] if best < 0 else _heavier(weights, best, tree[hi])
+        lo //= 2
+        hi //= 2
+    return best
+
+
+class SuggestionIndex:
+    """Weighted terms in a sorted array, searched by prefix with bisect."""
+
+    def __init__(self):
+        self._history: Dict[str, float] = {}
+        self._categories: Dict[str, float] = {}
+        self._prompt_counts: Dict[str, int] = {}
+        self._last_ids = {"history": 0, "category": 0, "art": 0}
+        # Swapped in as one tuple so readers never see a half-built index
+        self._snapshot: Tuple[List[str], List[float], Dict[str, List[str]], array] = ([], [], {}, array("i"))
+        self._refresh_lock = threading.Lock()
+        self._rebuilt_at = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self.built_at: Optional[float] = None
+        self.build_ms = 0.0
+
+    # Lookup
+
+    def suggest(self, prefix: str, limit: int = SUGGEST_LIMIT) -> List[str]:
+        prefix = normalize_term(prefix) if prefix.strip() else ""
+        if not prefix:
+            return []
+        terms, weights, head, tree = self._snapshot
+        if len(prefix) <= HEAD_PREFIX_LENGTH:
+            return head.get(prefix, [])[:limit]
+        start = bisect_left(terms, prefix)
+        end = bisect_left(terms, prefix + _PREFIX_END, start)
+        if start == end:
+            return []
+        # Best-first over sub-ranges: take a range's heaviest term, then split around it
+        first = _range_best(tree, weights, start, end)
+        heap = [(-weights[first], first, start, end)]
+        best = []
+        while heap and len(best) < limit:
+            _, i, lo, hi = heapq.heappop(heap)
+            best.append(terms[i])
+            for a, b in ((lo, i), (i + 1, hi)):
+                if a < b:
+                    j = _range_best(tree, weights, a, b)
+                    heapq.heappush(heap, (-weights[j], j, a, b))
+        return best
+
+    # Building
+
+    def refresh(self) -> None:
+        """Fold rows added since the last refresh into the counts and swap in a new array."""
+        if not self._refresh_lock.acquire(blocking=False):
+            return  # another thread is already refreshing
+        try:
+            t0 = time.perf_counter()
+            if time.time() - self._rebuilt_at >= SUGGEST_REBUILD_SECONDS:
+                # Start the totals over; readers keep the current snapshot until the swap
+                self._history, self._categories, self._prompt_counts = {}, {}, {}
+                self._last_ids = {"history": 0, "category": 0, "art": 0}
+                self._rebuilt_at = time.time()
+            db = SessionLocal()
+            try:
+                self._read_history(db)
+                self._read_categories(db)
+                self._read_prompts(db)
+            finally:
+                db.close()
+            self._snapshot = self._build()
+            self.build_ms = (time.perf_counter() - t0) * 1000
+            self.built_at = time.time()
+        finally:
+            self._refresh_lock.release()
+
+    def _read_history(self, db) -> None:
+        rows = db.query(models.SearchHistory.id, models.SearchHistory.query).filter(
+            models.SearchHistory.id > self._last_ids["history"]
+        ).order_by(models.SearchHistory.id).all()
+        for row_id, query in rows:
+            term = normalize_term(query or "")
+            if term:
+                self._history[term] = self._history.get(term, 0.0) + HISTORY_WEIGHT
+            self._last_ids["history"] = row_id
+
+    def _read_categories(self, db) -> None:
+        rows = db.query(models.Category.id, models.Category.name).filter(
+            models.Category.id > self._last_ids["category"]
+        ).order_by(models.Category.id).all()
+        for row_id, name in rows:
+            term = normalize_term(name or "")
+            if term:
+                self._categories[term] = CATEGORY_WEIGHT
+            self._last_ids["category"] = row_id
+
+    def _read_prompts(self, db) -> None:
+        counts = self._prompt_counts
+        while True:
+            rows = db.query(models.Art.id, models.Art.prompt).filter(
+                models.Art.id > self._last_ids["art"], models.Art.is_public == True
+            ).order_by(models.Art.id).limit(_PAGE_SIZE).all()
+            if not rows:
+                return
+            for _, prompt in rows:
+                for gram in prompt_ngrams(prompt or ""):
+                    counts[gram] = counts.get(gram, 0) + 1
+            self._last_ids["art"] = rows[-1].id
+            if len(counts) > SUGGEST_MAX_TERMS * 20:
+                # Bound memory on huge corpora: singletons are far below
+                # SUGGEST_MIN_COUNT and are almost never completions anyone wants
+                self._prompt_counts = counts = {gram: n for gram, n in counts.items() if n > 1}
+
+    def _build(self) -> Tuple[List[str], List[float], Dict[str, List[str]], array]:
+        weighted: Dict[str, float] = {
+            gram: float(n) for gram, n in self._prompt_counts.items() if n >= SUGGEST_MIN_COUNT
+        }
+        for source in (self._history, self._categories):
+            for term, weight in source.items():
+                weighted[term] = weighted.get(term, 0.0) + weight
+        if len(weighted) > SUGGEST_MAX_TERMS:
+            weighted = dict(heapq.nlargest(SUGGEST_MAX_TERMS, weighted.items(), key=lambda item: item[1]))
+
+        terms = sorted(weighted)
+        weights = [weighted[term] for term in terms]
+        head_heaps: Dict[str, List[Tuple[float, str]]] = {}
+        for term, weight in zip(terms, weights):
+            for n in range(1, min(HEAD_PREFIX_LENGTH, len(term)) + 1):
+                heap = head_heaps.setdefault(term[:n], [])
+                if len(heap) < MAX_SUGGEST_LIMIT:
+                    heapq.heappush(heap, (weight, term))
+                elif weight > heap[0][0]:
+                    heapq.heapreplace(heap, (weight, term))
+        # Same order as a range query: weight, then alphabetical
+        head = {
+            prefix: [term for _, term in sorted(heap, key=lambda item: (-item[0], item[1]))]
+            for prefix, heap in head_heaps.items()
+        }
+        return terms, weights, head, _max_tree(weights)
+
+    # Background refresh
+
+    def start(self) -> None:
+        """Build now and keep refreshing on a daemon thread (no-op when disabled or running)."""
+        if not SUGGEST_ENABLED or self._thread is not None:
+            return
+
+        def run():
+            while True:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.warning(f"suggestion index refresh failed: {e}")
+                time.sleep(SUGGEST_REFRESH_SECONDS)
+
+        self._thread = threading.Thread(target=run, name="suggest-index", daemon=True)
+        self._thread.start()
+
+    def stats(self) -> dict:
+        terms, _, head, _ = self._snapshot
+        return {
+            "terms": len(terms),
+            "head_prefixes": len(head),
+            "tracked_prompt_ngrams": len(self._prompt_counts),
+            "built_at": self.built_at,
+            "build_ms": round(self.build_ms, 1),
+        }
+
+
+suggestion_index = SuggestionIndex()
@@ -0,0 +1,69 @@
+"""
+Ranked Postgres full-text search over art prompts.
+
+`arts.search_vector` is a stored generated tsvector (prompt weighted above
+descriptive_prompt) with a GIN index, so matching is an index lookup rather
+than the `prompt ILIKE '%word%'` sequential scans it replaces. Results are
+ordered by ts_rank_cd, then quality_score, so the lexical path can serve
+search on its own whenever Chroma is unavailable.
+"""
+import re
+from typing import List, Sequence
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from . import models
+from .serialization import ART_CARD_COLUMNS
+
+TEXT_SEARCH_CONFIG = "english"
+MAX_ANY_TERMS = 10
+
+_TERM = re.compile(r"[^\W_]+")
+
+
+def search_terms(text: str, min_length: int = 1) -> List[str]:
+    """Distinct lowercase word tokens of `text`, in order, safe to splice into a websearch query."""
+    seen, terms = set(), []
+    for term in _TERM.findall(text.lower()):
+        if len(term) >= min_length and term not in seen:
+            seen.add(term)
+            terms.append(term)
+    return terms
+
+
+def tsquery(text: str):
+    return func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, text)
+
+
+def lexical_search(
+    db: Session, query: str, *filters, limit: int = 100, any_term: bool = False, columns: Sequence = ART_CARD_COLUMNS
+) -> list:
+    """Public art rows (card columns by default) matching `query`, best match first.
+
+    By default every term must match (websearch syntax: quotes, `or`, `-term`);
+    when that finds nothing, or with `any_term=True`, rows matching any of the
+    first MAX_ANY_TERMS terms are ranked instead.
+    """
+    rows = [] if any_term else ranked_query(db, tsquery(query), *filters, limit=limit, columns=columns).all()
+    if not rows:
+        terms = search_terms(query)[:MAX_ANY_TERMS]
+        if len(terms) > 1 or (any_term and terms):
+            rows = ranked_query(db, tsquery(" or ".join(terms)), *filters, limit=limit, columns=columns).all()
+    return rows
+
+
+def lexical_ids(db: Session, query: str, *filters, limit: int = 100) -> List[int]:
+    """Ids only, for fusing with other rankings before rows are fetched."""
+    return [row.id for row in lexical_search(db, query, *filters, limit=limit, columns=(models.Art.id,))]
+
+
+def ranked_query(db: Session, tsquery, *filters, limit: int = 100, columns: Sequence = ART_CARD_COLUMNS):
+    """The ranked full-text query itself (also used by explain_router_queries)."""
+    rank = func.ts_rank_cd(models.Art.search_vector, tsquery)
+    return (
+        db.query(*columns)
+        .filter(models.Art.search_vector.op("@@")(tsquery), models.Art.is_public == True, *filters)
+        .order_by(rank.desc(), models.Art.quality_score.desc().nullslast(), models.Art.id.desc())
+        .limit(limit)
+    )
@@ -0,0 +1,70 @@
+"""
+Publishing a curated/premium tier recompute to the API.
+
+The judge scripts (scripts/judge*.py) recompute the NTILE tiers in plain SQL
+over a psycopg2 connection. Afterwards the workers' tier feeds must be told
+to rebuild (feed_state `tiers`, see app/feeds.py) and Chroma's metadata must
+follow the rows whose flags moved (app/scripts/sync_chroma_metadata.py):
+
+    with conn.cursor() as cur:
+        snapshot_tiers(cur)
+        ...                             # reset + NTILE updates
+        retiered = publish_tiers(cur)
+    conn.commit()
+    sync_chroma_tiers(judged_ids + retiered, DB_URL)
+
+Only the standard library is imported here, so the scripts can use it without
+the backend's settings: they add backend/ to sys.path and import app.tiers.
+"""
+import os
+import subprocess
+import sys
+from typing import Iterable, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# app.feeds.FEED_STATE_NAME
+_FEED_STATE_NAME = "tiers"
+
+
+def snapshot_tiers(cur) -> None:
+    """Record the judged arts' flags before a recompute, until the transaction ends."""
+    cur.execute("""
+        CREATE TEMP TABLE tiers_before ON COMMIT DROP AS
+        SELECT id, is_curated, is_premium FROM arts WHERE judged_at IS NOT NULL
+    """)
+
+
+def publish_tiers(cur) -> List[int]:
+    """Bump the feed version after a recompute; the ids whose tier moved since `snapshot_tiers`."""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS feed_state (
+          name VARCHAR PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0, updated_at TIMESTAMP
+        )
+    """)
+    cur.execute("""
+        INSERT INTO feed_state (name, version, updated_at) VALUES (%s, 1, NOW())
+        ON CONFLICT (name) DO UPDATE SET version = feed_state.version + 1, updated_at = NOW()
+    """, (_FEED_STATE_NAME,))
+    cur.execute("""
+        SELECT a.id FROM arts a JOIN tiers_before b USING (id)
+        WHERE (a.is_curated, a.is_premium) IS DISTINCT FROM (b.is_curated, b.is_premium)
+    """)
+    return [art_id for (art_id,) in cur.fetchall()]
+
+
+def sync_chroma_tiers(art_ids: Iterable[int], database_url: str = "") -> None:
+    """Mirror the scores and tiers of `art_ids` into Chroma's metadata, which search filters on.
+
+    Runs app.scripts.sync_chroma_metadata with the backend's env; DATABASE_URL
+    falls back to `database_url` when unset. A failure is reported, not raised:
+    the recompute is already committed and the sync can be re-run on its own.
+    """
+    art_ids = sorted(set(art_ids))
+    if not art_ids:
+        return
+    env = {**os.environ, "DATABASE_URL": os.environ.get("DATABASE_URL") or database_url}
+    try:
+        subprocess.run([sys.executable, "-m", "app.scripts.sync_chroma_metadata", "--ids-file", "-"],
+                       input="\n".join(map(str, art_ids)), text=True, cwd=BACKEND_DIR, env=env, check=True)
+    except Exception as e:
+        print(f"  chroma metadata sync failed ({e}); re-run app.scripts.sync_chroma_metadata from backend/", file=sys.stderr)
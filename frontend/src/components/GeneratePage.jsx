@@ -19,6 +19,7 @@ import {
 import { FiCpu, FiImage, FiZap, FiStar } from "react-icons/fi";
 import { ArtGallery } from "./ArtGallery";
 import fetchAPI from "../services/api";
+import { fetchAllArtPages } from "../services/artService";
 import { useUser } from "../contexts/UserContext";
 import PurpleButton from "../components/Buttons";
 
@@ -137,7 +138,7 @@ const GeneratePage = () => {
     const storageKey = `arts-generate-${user.id}`;
     if (localStorage.getItem(storageKey)) return;
     try {
-      const data = await fetchAPI(`/arts/generated/${user.id}?viewer_id=${user.id}`);
+      const data = await fetchAllArtPages(`/arts/generated/${user.id}?viewer_id=${user.id}`);
       localStorage.setItem(storageKey, JSON.stringify(data));
     } catch (_) {}
   }, [user]);
@@ -1,7 +1,7 @@
 import React, { useCallback, useRef, useState } from "react";
 import { Box, Heading, Text, Flex, Icon } from "@chakra-ui/react";
 import { ArtGallery } from "./ArtGallery";
-import fetchAPI from "../services/api";
+import { fetchAllArtPages } from "../services/artService";
 import { useUser } from "../contexts/UserContext";
 import { FiHeart } from "react-icons/fi";
 import { useAuthRedirect } from "../hooks/useAuthRedirect";
@@ -35,7 +35,7 @@ const LikedPage = () => {
       // Build the endpoint with appropriate parameters
       const endpoint = `/arts/likes/4?viewer_id=4`;
       // Fetch the liked arts
-      const response = await fetchAPI(endpoint, "GET");
+      const response = await fetchAllArtPages(endpoint);
       // Store in localStorage
 
       localStorage.setItem(storageKey, JSON.stringify(response));
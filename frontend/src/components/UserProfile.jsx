@@ -11,7 +11,11 @@ import { ArtGallery } from "./ArtGallery";
 import fetchAPI from "../services/api";
 import { useParams } from "react-router-dom";
 import { useUser } from "../contexts/UserContext";
-import { fetchBatchArtData, extractStoredArtIds } from "../services/artService";
+import {
+  fetchBatchArtData,
+  extractStoredArtIds,
+  fetchAllArtPages,
+} from "../services/artService";
 //import { useAuthRedirect } from "../hooks/useAuthRedirect";
 
 const UserProfile = () => {
@@ -67,7 +71,7 @@ const UserProfile = () => {
         const endpoint = `/arts/${id}${
           currentUser?.id ? `?viewer_id=${currentUser.id}` : ""
         }`;
-        const data = await fetchAPI(endpoint, "GET");
+        const data = await fetchAllArtPages(endpoint);
         localStorage.setItem(storageKey, JSON.stringify(data));
 
         // Store current user ID
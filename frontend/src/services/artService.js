@@ -75,3 +75,30 @@ export const extractStoredArtIds = (storageKey) => {
     return [];
   }
 };
+
+/**
+ * Fetches every page of a cursor-paginated art list (profile, liked and
+ * generated galleries), following the X-Next-Cursor response header
+ * @param {string} endpoint - List endpoint, with or without a query string
+ * @param {number} pageSize - Arts requested per page (the API caps it at 200)
+ * @returns {Array} - All arts of the list, in API order
+ */
+export const fetchAllArtPages = async (endpoint, pageSize = 200) => {
+  const separator = endpoint.includes("?") ? "&" : "?";
+  const arts = [];
+  let cursor = null;
+  do {
+    const response = await fetchAPI(
+      `${endpoint}${separator}limit=${pageSize}${
+        cursor ? `&cursor=${encodeURIComponent(cursor)}` : ""
+      }`,
+      "GET",
+      null,
+      {},
+      false
+    );
+    arts.push(...(await response.json()));
+    cursor = response.headers.get("X-Next-Cursor");
+  } while (cursor);
+  return arts;
+};
@@ -35,6 +35,9 @@ except Exception:
 
 import google.generativeai as genai
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+from app.tiers import publish_tiers, snapshot_tiers, sync_chroma_tiers
+
 DB_URL = os.environ["NEON_DATABASE_URL_DIRECT"]
 GEMINI_KEY = os.environ["GEMINI_API_KEY"]
 JUDGE_MODEL = os.environ.get("JUDGE_MODEL", "gemini-2.5-flash-lite")
@@ -217,6 +220,7 @@ def main():
 
     print(f"=== Judging {len(rows)} images via {JUDGE_MODEL} ===")
     success = fail = 0
+    judged_ids = []
     t0 = time.time()
     for i, r in enumerate(rows):
         if args.print:
@@ -234,6 +238,7 @@ def main():
         score = combined_quality(d)
         update_art_score(conn, r["id"], d, score)
         success += 1
+        judged_ids.append(r["id"])
         if args.print:
             print(f"   score={score:5.1f}  {d.get('verdict','')[:140]}")
         else:
@@ -247,6 +252,8 @@ def main():
     # Final pass: re-mark is_curated / is_premium thresholds
     print("=== recomputing is_curated / is_premium thresholds ===")
     with conn.cursor() as cur:
+        # Flags before the recompute, to find the arts whose tier moved
+        snapshot_tiers(cur)
         # Reset
         cur.execute("UPDATE arts SET is_curated = false, is_premium = false WHERE judged_at IS NOT NULL")
         # Curated = top 30% by quality_score (among judged + non-empty src)
@@ -268,11 +275,14 @@ def main():
             UPDATE arts SET is_premium = true WHERE id IN (SELECT id FROM q WHERE bucket <= 1);
             """
         )
+        # Invalidate the API's precomputed tier feeds (see backend/app/feeds.py)
+        retiered = publish_tiers(cur)
         cur.execute("SELECT COUNT(*) FILTER (WHERE judged_at IS NOT NULL) judged, COUNT(*) FILTER (WHERE is_curated) curated, COUNT(*) FILTER (WHERE is_premium) premium FROM arts;")
         row = cur.fetchone()
     conn.commit()
     print(f"  judged={row[0]} curated={row[1]} premium={row[2]}")
     conn.close()
+    sync_chroma_tiers(judged_ids + retiered, DB_URL)
 
 
 if __name__ == "__main__":
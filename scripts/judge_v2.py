@@ -23,6 +23,9 @@ import psycopg2
 from psycopg2.extras import RealDictCursor
 from PIL import Image
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+from app.tiers import publish_tiers, snapshot_tiers, sync_chroma_tiers
+
 DB_URL = os.environ["NEON_DATABASE_URL_DIRECT"]
 CF_ACCOUNT = os.environ.get("CLOUDFLARE_ACCOUNT_ID")
 CF_TOKEN = os.environ.get("CLOUDFLARE_API_TOKEN")
@@ -168,6 +171,7 @@ def main():
     print(f"=== judging {len(rows)} arts (LAION primary + cafe + shadow{', LLaVA verdict' if not args.skip_llava else ''}) ===")
 
     ok = fail = 0
+    judged_ids = []
     t0 = time.time()
     for i, r in enumerate(rows):
         im = fetch_image(r["src"])
@@ -210,6 +214,7 @@ def main():
                 ))
             conn.commit()
             ok += 1
+            judged_ids.append(r["id"])
         except Exception as e:
             conn.rollback(); fail += 1
             print(f"  db update failed for {r['id']}: {e}", file=sys.stderr)
@@ -223,6 +228,8 @@ def main():
     # Recompute is_curated / is_premium thresholds
     print("=== recomputing curated/premium tiers ===")
     with conn.cursor() as cur:
+        # Flags before the recompute, to find the arts whose tier moved
+        snapshot_tiers(cur)
         cur.execute("UPDATE arts SET is_curated=false, is_premium=false WHERE judged_at IS NOT NULL")
         cur.execute("""
             WITH q AS (
@@ -238,11 +245,14 @@ def main():
             )
             UPDATE arts SET is_premium = true WHERE id IN (SELECT id FROM q WHERE bucket <= 1)
         """)
+        # Invalidate the API's precomputed tier feeds (see backend/app/feeds.py)
+        retiered = publish_tiers(cur)
         cur.execute("SELECT COUNT(*) FILTER(WHERE judged_at IS NOT NULL), COUNT(*) FILTER(WHERE is_curated), COUNT(*) FILTER(WHERE is_premium) FROM arts")
         j, c, pm = cur.fetchone()
     conn.commit()
     print(f"  judged={j} curated={c} premium={pm}")
     conn.close()
+    sync_chroma_tiers(judged_ids + retiered, DB_URL)
 
 
 if __name__ == "__main__":
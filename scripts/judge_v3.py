@@ -23,6 +23,9 @@ from psycopg2.extras import RealDictCursor
 from PIL import Image
 import google.generativeai as genai
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+from app.tiers import publish_tiers, snapshot_tiers, sync_chroma_tiers
+
 DB_URL = os.environ["NEON_DATABASE_URL_DIRECT"]
 GEMINI_KEY = os.environ["GEMINI_API_KEY"]
 JUDGE_MODEL_ID = os.environ.get("JUDGE_MODEL", "gemini-2.5-flash")
@@ -126,6 +129,7 @@ def main():
     print(f"=== judging {len(rows)} arts via Gemini 2.5 Flash ===", flush=True)
 
     ok = fail = 0
+    judged_ids = []
     t0 = time.time()
     for i, r in enumerate(rows):
         raw = fetch_image(r["src"])
@@ -144,6 +148,7 @@ def main():
                       scores["quality_score"], scores["judge_notes"], r["id"]))
             conn.commit()
             ok += 1
+            judged_ids.append(r["id"])
         except Exception as e:
             conn.rollback(); fail += 1
             print(f"  db update failed for {r['id']}: {e}", file=sys.stderr)
@@ -158,6 +163,8 @@ def main():
 
     print("=== recomputing curated/premium tiers ===")
     with conn.cursor() as cur:
+        # Flags before the recompute, to find the arts whose tier moved
+        snapshot_tiers(cur)
         cur.execute("UPDATE arts SET is_curated=false, is_premium=false WHERE judged_at IS NOT NULL")
         cur.execute("""
             WITH q AS (
@@ -173,11 +180,14 @@ def main():
             )
             UPDATE arts SET is_premium=true WHERE id IN (SELECT id FROM q WHERE bucket <= 1)
         """)
+        # Invalidate the API's precomputed tier feeds (see backend/app/feeds.py)
+        retiered = publish_tiers(cur)
         cur.execute("SELECT COUNT(*) FILTER(WHERE judged_at IS NOT NULL), COUNT(*) FILTER(WHERE is_curated), COUNT(*) FILTER(WHERE is_premium) FROM arts")
         j, c, pm = cur.fetchone()
     conn.commit()
     print(f"  judged={j} curated={c} premium={pm}")
     conn.close()
+    sync_chroma_tiers(judged_ids + retiered, DB_URL)
 
 
 if __name__ == "__main__":